@@ -9,14 +9,15 @@ from utils.dataloader import load_data
 
 st.title("🧠 Feature Selection")
 
-# Load dataset
-df = load_data()
 target_column = "track"
 grades = [7, 8, 9, 10]
 
 # Select grade level
 grade = st.selectbox("Select Grade Level", grades)
 
+# Load only the columns needed for this grade level
+df = load_data(grade=grade)
+
 selector = FeatureSelector(df, target_column)
 
 # Select features for the chosen grade
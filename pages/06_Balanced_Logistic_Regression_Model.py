@@ -5,46 +5,21 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from utils.dataloader import load_data
-from utils.feature_selection import FeatureSelector
-from utils.balanced_logreg import BalancedLogisticModel
+from utils.pipeline import run_pipeline
 
 st.title("📊 Balanced Logistic Regression Model")
 
-df = load_data()
 target_column = "track"
 grades = [7, 8, 9, 10]
 grade = st.selectbox("Select Grade Level", grades)
-
-selector = FeatureSelector(df, target_column)
-
-# --- CUMULATIVE FEATURE SELECTION LOGIC ---
-included_grades = list(range(7, grade + 1))
-final_features = []
-
-for g in included_grades:
-    feats = selector.select_features(g)
-    prefix = f"g{g}_"
-    grade_feats = [f for f in feats if f.startswith(prefix)]
-    final_features.extend(grade_feats)
-
-# Add age and gender only once
-if 'age' in df.columns:
-    final_features.append('age')
-if 'gender' in df.columns:
-    final_features.append('gender')
-
-# Remove duplicates while preserving order
-final_features = list(dict.fromkeys(final_features))
-
-# --- Train Model ---
-model = BalancedLogisticModel(df, target_column)
-model.train_model(grade, final_features)
-
-# Filter out non-subject features when calculating stats
-filtered_features = [feat for feat in final_features if feat not in ['gender', 'age']]
-
-subject_stats = model.calculate_grade_statistics(filtered_features)
+scale = st.checkbox("Standardise features before training", help="Fits a StandardScaler on the training split so the solver converges in fewer iterations.")
+tuned = st.checkbox("Use tuned hyperparameters", help="C, penalty and solver chosen by `python -m utils.tuning`; implies standardised features.")
+
+# --- Feature selection and training, shared with the evaluation page and other sessions ---
+result = run_pipeline(grade, variant="balanced", target_column=target_column, scale=scale, tuned=tuned)
+final_features = result.features
+model = result.model
+subject_stats = result.subject_stats
 subject_grade_total = subject_stats['Academic (Count)'].sum() + subject_stats['TVL (Count)'].sum()
 
 # --- Display Outputs ---
@@ -56,6 +31,9 @@ if final_features:
 else:
     st.info(f"No significant features found for Grade {grade}.")
 
+fit_time = f"{model.fit_seconds * 1000:.0f} ms" if model.fit_seconds is not None else "n/a"
+st.caption(f"Solver iterations: {model.n_iter} · Fit time: {fit_time} · C={model.model.C:g}, {model.model.penalty} penalty")
+
 # Get coefficients
 coeff_df = model.get_coefficients()
 # st.write(coeff_df)
@@ -64,6 +42,7 @@ if not coeff_df.empty:
     st.markdown(
         "- **Positive coefficient**: Feature leans more toward TVL track\n"
         "- **Negative coefficient**: Feature pushes prediction toward Academic\n"
+        "- **Scaled coefficient**: Effect of a one-standard-deviation change, comparable across features\n"
     )
 
     # Create a Plotly bar chart
@@ -85,6 +64,9 @@ if not coeff_df.empty:
     
     st.plotly_chart(fig)
     # st.write(coeff_df)
+
+    with st.expander("📄 Show Coefficient Table (original and scaled units)"):
+        st.dataframe(coeff_df.set_index("Feature"))
 else:
     st.info("No coefficients available. Make sure the model has been trained.")
 
@@ -7,34 +7,39 @@ import plotly.graph_objects as go
 import plotly.express as px
 import numpy as np
 
-from utils.dataloader import load_data
-from utils.feature_selection import FeatureSelector
-from utils.balanced_logreg import BalancedLogisticModel
+from utils.pipeline import run_pipeline
 from utils.evaluation import evaluate_model
+from utils.cross_validation import DEFAULT_FOLDS, run_cross_validation
 
 st.title("📈 Model Evaluation Metrics")
 
 # Setup
-df = load_data()
 target = "track"
 grades = [7, 8, 9, 10]
 grade = st.selectbox("Select Grade Level", grades)
+scale = st.checkbox("Standardise features before training")
+tuned = st.checkbox("Use tuned hyperparameters", help="C, penalty and solver chosen by `python -m utils.tuning`; implies standardised features.")
+mode = st.radio("Evaluation method", ["Hold-out split (80/20)", f"Stratified {DEFAULT_FOLDS}-fold cross-validation"], horizontal=True)
 
-selector = FeatureSelector(df, target)
-selected_features = selector.select_features(grade)
+# Reuses the model trained for the model page when it's already in the shared cache
+result = run_pipeline(grade, variant="balanced", target_column=target, scale=scale, tuned=tuned)
+selected_features = result.features
 
 if not selected_features:
     st.warning("No significant features found for this grade.")
     st.stop()
 
-model = BalancedLogisticModel(df, target)
-model.train_model(grade, selected_features)
-
-# Get predicted probabilities
-y_proba = model.model.predict_proba(model.X_test)
+model = result.model
+y_proba = result.y_proba
 
 # Evaluate
-eval_results = evaluate_model(model.y_test, model.y_pred, y_proba, model)
+cv_result = None
+if mode.startswith("Stratified"):
+    # Pooled out-of-fold predictions; cached per dataset so reruns don't refit the folds
+    cv_result = run_cross_validation(grade, variant="balanced", target_column=target, scale=scale, tuned=tuned)
+    eval_results = cv_result.aggregate
+else:
+    eval_results = evaluate_model(model.y_test, model.y_pred, y_proba, model)
 
 # Display
 st.title("Evaluation Metrics")
@@ -42,6 +47,11 @@ st.subheader("Model Overall Accuracy")
 st.subheader(f"{eval_results['accuracy'] * 100:.2f}%")
 st.write(f"The model achieved an overall accuracy of {eval_results['accuracy'] * 100:.2f}%, meaning it accurately identified the appropriate Senior High School track for the majority of students.")
 
+if cv_result is not None:
+    st.subheader("Cross-validation Folds")
+    st.dataframe(cv_result.fold_summary.round(4))
+    st.write(f"Across {len(cv_result.folds)} folds: accuracy {cv_result.mean_accuracy * 100:.2f}% ± {cv_result.std_accuracy * 100:.2f}, AUC {cv_result.mean_auc:.3f} ± {cv_result.std_auc:.3f}. The confusion matrix and report below pool the out-of-fold predictions.")
+
 st.subheader("Confusion Matrix")
 st.dataframe(eval_results["confusion_matrix_df"])
 
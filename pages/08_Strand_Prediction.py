@@ -0,0 +1,78 @@
+# pages/08_Strand_Prediction.py
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.express as px
+
+from utils.dataloader import STRAND_DATA_PATH
+from utils.pipeline import run_pipeline
+from utils.evaluation import evaluate_model
+
+st.title("🧭 Strand Prediction")
+st.write("Predicts the Senior High School strand (ABM, HUMSS, STEM, IA-AS, IA-CES/EPAS, ICT, HE) with one multinomial logistic regression over all strands.")
+
+# Setup
+target = "strand"
+grades = [7, 8, 9, 10]
+grade = st.selectbox("Select Grade Level", grades)
+balanced = st.checkbox("Balance strand weights", help="Weights each strand inversely to its size, like the balanced track model.")
+
+# Multinomial fits converge far faster on standardised grades
+result = run_pipeline(grade, variant="balanced" if balanced else "baseline", target_column=target,
+                      path=STRAND_DATA_PATH, scale=True)
+model = result.model
+
+if not result.features:
+    st.warning("No significant features found for this grade.")
+    st.stop()
+
+st.markdown(f"##### ✅ Features Used for Grade {grade}")
+st.markdown(", ".join(result.features))
+st.caption(f"Solver iterations: {model.n_iter} · Classes: {len(model.model.classes_)}")
+
+eval_results = evaluate_model(model.y_test, model.y_pred, result.y_proba, model)
+
+st.subheader("Model Overall Accuracy")
+st.subheader(f"{eval_results['accuracy'] * 100:.2f}%")
+st.write(f"Chance level for {len(model.model.classes_)} strands is about {100 / len(model.model.classes_):.1f}%.")
+
+# Predicted strand distribution
+pred_df = pd.DataFrame.from_dict(model.prediction_counts, orient='index', columns=['Count']).reset_index()
+pred_df.columns = ['Strand', 'Count']
+fig = px.pie(pred_df, names='Strand', values='Count', title='Predicted Strand Distribution', hole=0.3)
+st.plotly_chart(fig)
+
+st.subheader("Confusion Matrix")
+st.dataframe(eval_results["confusion_matrix_df"])
+
+st.subheader("Per-strand Confusion (one vs rest)")
+st.dataframe(eval_results["per_class_confusion"])
+
+st.subheader("Classification Report")
+st.dataframe(eval_results["classification_report"].round(2))
+
+# One-vs-rest ROC curves
+if eval_results["roc_curves_ovr"] is not None:
+    st.subheader("ROC Curves (one vs rest)")
+    fig = go.Figure()
+    for strand, (fpr, tpr) in eval_results["roc_curves_ovr"].items():
+        class_auc = eval_results["roc_auc_ovr"][strand]
+        fig.add_trace(go.Scatter(x=fpr, y=tpr, mode='lines', name=f"{strand} (AUC = {class_auc:.2f})"))
+    fig.add_trace(go.Scatter(x=[0, 1], y=[0, 1], mode='lines', name='Random Guess', line=dict(color='red', dash='dash')))
+    fig.update_layout(
+        title='One-vs-rest ROC Curves',
+        xaxis_title='False Positive Rate',
+        yaxis_title='True Positive Rate',
+        showlegend=True,
+        width=700,
+        height=500
+    )
+    st.plotly_chart(fig)
+
+    st.markdown(f"""
+The macro-averaged one-vs-rest **AUC** is **{eval_results['roc_auc']:.2f}**. Each curve shows how well the model separates one strand from all the others; 0.5 is no better than guessing.
+""")
+    st.dataframe(eval_results["roc_auc_ovr"].round(3))
+
+st.write("### Subject Grades (Grouped by Predicted Strand)")
+st.dataframe(result.subject_stats)
@@ -0,0 +1,67 @@
+import pandas as pd
+
+from utils.dataloader import DEFAULT_PATH, iter_chunks, load_data, read_appended
+from utils.pipeline import build_pipeline
+
+HEADER = "age,gender,track,g7_math,g7_english\n"
+ROWS = [
+    "15,Male,Academic,88.5,90.0\n",
+    ",Female,TVL,79.0,81.5\n",
+    "16,Female,Academic,92.0,89.0\n",
+]
+
+
+def write_csv(tmp_path, rows):
+    path = tmp_path / "students.csv"
+    path.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(path)
+
+
+def test_load_data_keeps_rows_with_blank_age(tmp_path):
+    df = load_data(write_csv(tmp_path, ROWS))
+
+    assert len(df) == 3
+    assert df['age'].isna().sum() == 1
+    assert df['age'].dropna().tolist() == [15, 16]
+    assert len(df.dropna()) == 2
+
+
+def test_iter_chunks_and_read_appended_accept_blank_age(tmp_path):
+    path = write_csv(tmp_path, ROWS[:1])
+    offset = len(HEADER) + len(ROWS[0])
+    with open(path, 'a', encoding="utf-8") as f:
+        f.writelines(ROWS[1:])
+
+    chunks = list(iter_chunks(path, chunksize=2))
+    assert sum(chunk['age'].isna().sum() for chunk in chunks) == 1
+
+    appended, end = read_appended(path, offset)
+    assert len(appended) == 2
+    assert pd.isna(appended['age'].iloc[0])
+    assert end == len(HEADER) + sum(len(row) for row in ROWS)
+
+
+def test_writes_to_a_loaded_frame_do_not_reach_the_cache(tmp_path):
+    path = write_csv(tmp_path, ROWS)
+    first = load_data(path)
+    first.loc[0, 'g7_math'] = -1
+
+    assert load_data(path).loc[0, 'g7_math'] == 88.5
+
+
+def test_grade_model_trains_on_a_file_with_a_blank_age(tmp_path):
+    lines = open(DEFAULT_PATH, encoding="utf-8-sig").read().splitlines(True)
+    fields = lines[5].split(',')
+    fields[0] = ''
+    lines[5] = ','.join(fields)
+    path = tmp_path / "students.csv"
+    path.write_text("".join(lines), encoding="utf-8")
+
+    df = load_data(str(path))
+    results = build_pipeline(df, 7, registry=None)
+
+    assert 'age' in results['baseline'].features
+    model = results['baseline'].model
+    # The blank-age row is dropped before the split, so neither side contains it
+    assert len(model.df_with_predictions) == len(df) - 1
+    assert df.index[df['age'].isna()][0] not in model.df_with_predictions.index
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dataloader import DEFAULT_PATH, columns_for_grade, load_data
+from utils.feature_scoring import StreamingFeatureScorer, score_file
+from utils.feature_selection import FeatureSelector
+
+GRADE = 8
+
+
+def expected_scores(df, grade=GRADE):
+    selector = FeatureSelector(df, 'track')
+    selector.select_features(grade)
+    return selector.scores_per_grade[grade]
+
+
+def assert_scores_match(actual, expected):
+    actual = actual.loc[expected.index]
+    np.testing.assert_allclose(actual['F-Score'].to_numpy(dtype=float), expected['F-Score'].to_numpy(dtype=float),
+                               rtol=1e-6, equal_nan=True)
+    np.testing.assert_allclose(actual['P-Value'].to_numpy(dtype=float), expected['P-Value'].to_numpy(dtype=float),
+                               rtol=1e-6, atol=1e-300)
+
+
+@pytest.mark.parametrize('chunksize', [97, 500, 5000])
+def test_streamed_scores_match_feature_selector(chunksize):
+    df = load_data(DEFAULT_PATH, columns=columns_for_grade(GRADE))
+    scorer = score_file(GRADE, path=DEFAULT_PATH, chunksize=chunksize)
+    assert scorer.rows == len(df)
+    assert_scores_match(scorer.scores(), expected_scores(df))
+
+
+def test_merged_halves_match_feature_selector():
+    df = load_data(DEFAULT_PATH, columns=columns_for_grade(GRADE))
+    half = len(df) // 2
+
+    first = StreamingFeatureScorer('track').update(df.iloc[:half])
+    second = StreamingFeatureScorer('track')
+    for start in range(half, len(df), 200):
+        second.update(df.iloc[start:start + 200])
+    # The halves are centred on different shifts; merge re-centres the second onto the first
+    assert not np.allclose(first.shift, second.shift)
+
+    merged = first.merge(second)
+    assert merged.rows == len(df)
+    assert_scores_match(merged.scores(), expected_scores(df))
+
+
+def test_features_with_missing_values_are_scored_on_their_own_rows(tmp_path):
+    lines = open(DEFAULT_PATH, encoding="utf-8-sig").read().splitlines(True)
+    for row in (5, 50):
+        fields = lines[row].split(',')
+        fields[0] = ''
+        lines[row] = ','.join(fields)
+    path = tmp_path / "students.csv"
+    path.write_text("".join(lines), encoding="utf-8")
+
+    df = load_data(str(path), columns=columns_for_grade(GRADE))
+    scorer = score_file(GRADE, path=str(path), chunksize=300)
+    assert_scores_match(scorer.scores(), expected_scores(df))
+    assert pd.notna(scorer.scores().loc['age', 'P-Value'])
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from utils.dataloader import DEFAULT_PATH, STRAND_DATA_PATH, columns_for_grade, load_data
+from utils.inference import TOLERANCE, LinearScorer
+from utils.logistic_regression import LogisticModel
+
+GRADE = 8
+FEATURES = [f"g{g}_{subject}" for g in (7, 8) for subject in ('filipino', 'english', 'math', 'science')] + ['age', 'gender']
+
+
+def train(path, target_column, scale):
+    df = load_data(path, columns=columns_for_grade(GRADE, target_column))
+    model = LogisticModel(df, target_column, registry=None, scale=scale)
+    model.train_model(GRADE, FEATURES)
+    return model
+
+
+@pytest.mark.parametrize('path, target_column, scale', [
+    (DEFAULT_PATH, 'track', False),
+    (DEFAULT_PATH, 'track', True),
+    (STRAND_DATA_PATH, 'strand', False),
+    (STRAND_DATA_PATH, 'strand', True),
+])
+def test_scorer_matches_sklearn_on_held_out_rows(tmp_path, path, target_column, scale):
+    model = train(path, target_column, scale)
+    assert len(model.model.classes_) == (2 if target_column == 'track' else 7)
+
+    artifact = tmp_path / "model.npz"
+    LinearScorer.from_model(model).save(artifact)
+    scorer = LinearScorer.load(artifact)
+
+    # X_test is the held-out split with gender already label-encoded
+    expected = model.predict_proba(model.X_test)
+    actual = scorer.predict_proba(model.X_test.to_numpy(dtype=np.float64))
+    np.testing.assert_allclose(actual, expected, atol=TOLERANCE)
+    np.testing.assert_array_equal(scorer.predict(model.X_test.to_numpy(dtype=np.float64)), model.y_pred)
+
+
+def test_encode_uses_the_model_gender_encoding():
+    model = train(DEFAULT_PATH, 'track', scale=True)
+    scorer = LinearScorer.from_model(model)
+    student = {f: 85.0 for f in FEATURES}
+    student.update(age=16, gender='Female')
+
+    X = scorer.encode([student])
+    assert X[0, FEATURES.index('gender')] == list(model.label_encoder.classes_).index('Female')
+    with pytest.raises(ValueError):
+        scorer.encode([dict(student, gender='Other')])
@@ -0,0 +1,196 @@
+# Headless batch scoring of student files with a trained grade model.
+#
+# Usage:
+#   python -m utils.batch_scoring --grade 10 --input students.csv --output predictions.parquet
+#   python -m utils.batch_scoring --grade 10 --incremental --input students.csv --output predictions.parquet
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.dataloader import DEFAULT_CHUNKSIZE, DEFAULT_PATH, iter_chunks
+from utils.incremental import IncrementalGradeModel
+from utils.pipeline import VARIANTS, run_pipeline
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Parquet types of the columns scoring adds
+OUTPUT_TYPES = {
+    'predicted_track': pa.string(),
+    'predicted_strand': pa.string(),
+    'probability': pa.float64(),
+} if pa is not None else {}
+
+# Set in each worker by _init_worker so the model is sent once per process, not once per chunk
+_scorer = None
+
+
+class ChunkScorer:
+    """Scores frames of students with a fitted LogisticModel's estimator and gender encoding."""
+
+    def __init__(self, estimator, features, label_encoder, scaler=None):
+        self.estimator = estimator
+        self.features = list(features)
+        self.label_encoder = label_encoder
+        self.scaler = scaler
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(model.model, model.feature_names, model.label_encoder, model.scaler)
+
+    def score(self, chunk):
+        X = chunk[self.features].copy()
+        if 'gender' in self.features:
+            # Same codes as label_encoder.transform, but genders it never saw become NaN instead of raising
+            known = pd.Index(self.label_encoder.classes_)
+            gender = chunk['gender']
+            if isinstance(gender.dtype, pd.CategoricalDtype):
+                # Encode the few categories once and index by code instead of mapping every row's string
+                codes = known.get_indexer(gender.cat.categories.astype(str)).astype(float)
+                codes[codes < 0] = np.nan
+                X['gender'] = np.where(gender.cat.codes >= 0, codes[gender.cat.codes], np.nan)
+            else:
+                codes = known.get_indexer(gender.astype(str)).astype(float)
+                codes[codes < 0] = np.nan
+                X['gender'] = codes
+
+        # Rows with missing grades or an unknown gender can't be scored; they get empty predictions
+        complete = X.notna().all(axis=1).to_numpy()
+
+        predicted = np.full(len(chunk), None, dtype=object)
+        probability = np.full(len(chunk), np.nan)
+        if complete.any():
+            X = X[complete]
+            if self.scaler is not None:
+                # The incremental model's scaler was fit on a plain array rather than a frame
+                X = self.scaler.transform(X if hasattr(self.scaler, 'feature_names_in_') else X.to_numpy())
+            proba = self.estimator.predict_proba(X)
+            best = proba.argmax(axis=1)
+            predicted[complete] = self.estimator.classes_[best]
+            probability[complete] = proba[np.arange(len(best)), best]
+
+        out = chunk.copy()
+        out['predicted_track'] = predicted
+        out['probability'] = probability
+        return out
+
+
+def _init_worker(scorer):
+    global _scorer
+    _scorer = scorer
+
+
+def _score_chunk(chunk):
+    return _scorer.score(chunk)
+
+
+class _OutputWriter:
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self.writer = None
+        self.header = True
+        if self.parquet and pq is None:
+            raise RuntimeError("⚠️ Writing Parquet output requires pyarrow.")
+
+    def write(self, frame):
+        if self.parquet:
+            # Per-chunk categoricals have different dictionaries; write them as plain strings
+            for col in frame.select_dtypes(include='category').columns:
+                frame[col] = frame[col].astype(object)
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, self._schema(table.schema))
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            frame.to_csv(self.path, mode='w' if self.header else 'a', header=self.header, index=False)
+            self.header = False
+
+    @staticmethod
+    def _schema(inferred):
+        """The first chunk's schema with the prediction columns declared, since a chunk with no scorable rows infers them as null."""
+        for name, type_ in OUTPUT_TYPES.items():
+            index = inferred.get_field_index(name)
+            if index >= 0:
+                inferred = inferred.set(index, pa.field(name, type_))
+        return inferred
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def score_file(scorer, input_path, output_path, chunksize=DEFAULT_CHUNKSIZE, workers=None):
+    """Streams input_path through the scorer and writes predictions; returns (rows, seconds)."""
+    workers = workers or os.cpu_count() or 1
+    writer = _OutputWriter(output_path)
+    chunks = iter_chunks(input_path, chunksize=chunksize)
+    rows = 0
+    start = time.perf_counter()
+
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                writer.write(scorer.score(chunk))
+                rows += len(chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scorer,)) as pool:
+                # Bound the chunks in flight so memory stays flat, and write them back in input order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_score_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        scored = pending.popleft().result()
+                        writer.write(scored)
+                        rows += len(scored)
+                while pending:
+                    scored = pending.popleft().result()
+                    writer.write(scored)
+                    rows += len(scored)
+    finally:
+        writer.close()
+
+    return rows, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a file of students with a trained grade-level track model.")
+    parser.add_argument('--grade', type=int, choices=[7, 8, 9, 10], required=True)
+    parser.add_argument('--variant', choices=VARIANTS, default='baseline')
+    parser.add_argument('--input', required=True, help="CSV file of students to score")
+    parser.add_argument('--output', required=True, help="Output .csv or .parquet file")
+    parser.add_argument('--train-data', default=DEFAULT_PATH, help="Dataset the grade model is trained on")
+    parser.add_argument('--scale', action='store_true', help="Use the model trained on standardised features")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Use the model kept up to date by utils.incremental instead of the batch-trained one")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if args.incremental:
+        model = IncrementalGradeModel.load(args.train_data, args.grade, args.variant)
+        if model is None:
+            parser.error(f"no incremental grade {args.grade} {args.variant} model for {args.train_data}; "
+                         f"run python -m utils.incremental init first")
+    else:
+        # Loads the model from the registry when it has been trained before
+        model = run_pipeline(args.grade, variant=args.variant, path=args.train_data, scale=args.scale).model
+    scorer = ChunkScorer.from_model(model)
+
+    rows, seconds = score_file(scorer, args.input, args.output, chunksize=args.chunksize, workers=args.workers)
+    rate = rows / seconds if seconds > 0 else float('inf')
+    print(f"Scored {rows:,} rows in {seconds:.2f}s ({rate:,.0f} rows/s) -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
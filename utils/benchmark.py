@@ -0,0 +1,194 @@
+# Solver and configuration benchmark for the grade-level track models.
+#
+# Usage:
+#   python -m utils.benchmark --grades 10 --synthetic-rows 100000 1000000
+#   python -m utils.benchmark --solvers lbfgs newton-cholesky --dtypes float32 --output bench.csv
+import argparse
+import glob
+import itertools
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from utils.dataloader import GRADE_LEVELS, SCHEMA, columns_for_grade, load_data
+from utils.pipeline import cumulative_features
+
+SOLVERS = ['lbfgs', 'liblinear', 'newton-cholesky', 'saga']
+TOLERANCES = [1e-4, 1e-3]
+DTYPES = ['float64', 'float32']
+SCALING = [False, True]
+
+# The configuration LogisticModel uses today; deltas are reported against it
+REFERENCE = {'solver': 'lbfgs', 'tol': 1e-4, 'dtype': 'float64', 'scale': False}
+
+SUBJECT_NAMES = ['filipino', 'english', 'math', 'science', 'ap', 'tle', 'mapeh', 'esp']
+
+
+def make_synthetic(rows, seed=42):
+    """Student records with the bundled schema and a learnable track signal, generated vectorised."""
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(0, 1, rows)
+    gender = rng.choice(['Male', 'Female'], size=rows)
+
+    data = {
+        'age': rng.integers(15, 19, size=rows).astype('int8'),
+        'gender': gender,
+    }
+    for g in GRADE_LEVELS:
+        for subject in SUBJECT_NAMES:
+            grades = 86 + 4 * ability + rng.normal(0, 3, rows)
+            data[f"g{g}_{subject}"] = np.clip(grades, 75, 100).astype('float32')
+
+    # Lower-performing students lean towards TVL, as in the bundled data
+    logit = -1.5 - 1.2 * ability + 0.4 * (gender == 'Male')
+    data['track'] = np.where(rng.random(rows) < 1 / (1 + np.exp(-logit)), 'TVL', 'Academic')
+
+    df = pd.DataFrame(data)
+    return df.astype({col: dtype for col, dtype in SCHEMA.items() if col in df.columns})
+
+
+def _design_matrix(df, grade, target_column):
+    features = cumulative_features(df, grade, target_column)
+    X = df[features].copy()
+    if 'gender' in X.columns:
+        X['gender'] = X['gender'].cat.codes if hasattr(X['gender'], 'cat') else pd.factorize(X['gender'])[0]
+    X = X.dropna()
+    y = df.loc[X.index, target_column].astype(str).to_numpy()
+    return X.to_numpy(dtype='float64'), y, features
+
+
+def _fit(config, class_weight, X_train, y_train):
+    model = LogisticRegression(
+        solver=config['solver'], tol=config['tol'], max_iter=1000, class_weight=class_weight
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        seconds = time.perf_counter() - start
+    return model, seconds
+
+
+def benchmark_dataset(name, df, grades, variants, configs, target_column='track', measure_memory=True):
+    rows = []
+    for grade in grades:
+        X, y, features = _design_matrix(df, grade, target_column)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+        prepared = {}
+        for dtype, scale in {(c['dtype'], c['scale']) for c in configs}:
+            train, test = X_train, X_test
+            if scale:
+                scaler = StandardScaler().fit(train)
+                train, test = scaler.transform(train), scaler.transform(test)
+            prepared[dtype, scale] = (train.astype(dtype), test.astype(dtype))
+
+        for variant in variants:
+            class_weight = 'balanced' if variant == 'balanced' else None
+            for config in configs:
+                train, test = prepared[config['dtype'], config['scale']]
+                model, seconds = _fit(config, class_weight, train, y_train)
+
+                peak_mb = np.nan
+                if measure_memory:
+                    # Separate traced fit so tracing overhead doesn't skew the timing
+                    tracemalloc.start()
+                    _fit(config, class_weight, train, y_train)
+                    peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                    tracemalloc.stop()
+
+                proba = model.predict_proba(test)[:, list(model.classes_).index('TVL')]
+                rows.append({
+                    'dataset': name,
+                    'rows': len(df),
+                    'grade': grade,
+                    'features': len(features),
+                    'variant': variant,
+                    **config,
+                    'fit_seconds': seconds,
+                    'n_iter': int(np.max(model.n_iter_)),
+                    'peak_mb': peak_mb,
+                    'accuracy': accuracy_score(y_test, model.predict(test)),
+                    'auc': roc_auc_score(y_test == 'TVL', proba),
+                })
+
+    results = pd.DataFrame(rows)
+
+    # Deltas against the current configuration for the same dataset, grade and variant
+    reference = results
+    for key, value in REFERENCE.items():
+        reference = reference[reference[key] == value]
+    reference = reference.set_index(['dataset', 'grade', 'variant'])[['fit_seconds', 'accuracy', 'auc']]
+    results = results.join(reference, on=['dataset', 'grade', 'variant'], rsuffix='_reference')
+    results['speedup'] = results['fit_seconds_reference'] / results['fit_seconds']
+    results['accuracy_delta'] = results['accuracy'] - results['accuracy_reference']
+    results['auc_delta'] = results['auc'] - results['auc_reference']
+    return results.drop(columns=['fit_seconds_reference', 'accuracy_reference', 'auc_reference'])
+
+
+def build_configs(solvers=SOLVERS, tolerances=TOLERANCES, dtypes=DTYPES, scaling=SCALING):
+    configs = [
+        {'solver': solver, 'tol': tol, 'dtype': dtype, 'scale': scale}
+        for solver, tol, dtype, scale in itertools.product(solvers, tolerances, dtypes, scaling)
+    ]
+    # The reference configuration is always run so deltas can be computed
+    if REFERENCE not in configs:
+        configs.insert(0, dict(REFERENCE))
+    return configs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark LogisticRegression solvers and configurations on the grade models.")
+    parser.add_argument('--data', nargs='*', default=None, help="CSV files to benchmark (default: every file in data/)")
+    parser.add_argument('--synthetic-rows', nargs='*', type=int, default=[], help="Also benchmark synthetic datasets of these sizes")
+    parser.add_argument('--grades', nargs='*', type=int, default=GRADE_LEVELS)
+    parser.add_argument('--variants', nargs='*', choices=['baseline', 'balanced'], default=['baseline', 'balanced'])
+    parser.add_argument('--solvers', nargs='*', choices=SOLVERS, default=SOLVERS)
+    parser.add_argument('--tols', nargs='*', type=float, default=TOLERANCES)
+    parser.add_argument('--dtypes', nargs='*', choices=DTYPES, default=DTYPES)
+    parser.add_argument('--scaling', nargs='*', choices=['raw', 'scaled'], default=['raw', 'scaled'])
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced peak-memory fits")
+    parser.add_argument('--output', help="Write the full results to this CSV file")
+    args = parser.parse_args(argv)
+
+    configs = build_configs(args.solvers, args.tols, args.dtypes, [s == 'scaled' for s in args.scaling])
+
+    datasets = []
+    for path in args.data if args.data is not None else sorted(glob.glob('data/*.csv')):
+        columns = columns_for_grade(max(args.grades))
+        datasets.append((path, load_data(path, columns=columns)))
+    for rows in args.synthetic_rows:
+        datasets.append((f"synthetic-{rows}", make_synthetic(rows)))
+
+    results = pd.concat(
+        [benchmark_dataset(name, df, args.grades, args.variants, configs, measure_memory=not args.no_memory) for name, df in datasets],
+        ignore_index=True,
+    )
+
+    columns = ['dataset', 'rows', 'grade', 'variant', 'solver', 'tol', 'dtype', 'scale', 'fit_seconds', 'speedup',
+               'n_iter', 'peak_mb', 'accuracy_delta', 'auc_delta']
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(results[columns].round(4).to_string(index=False))
+
+    # Fastest configuration per dataset that keeps accuracy and AUC within half a point of the reference
+    keeps_accuracy = results[(results['accuracy_delta'] >= -0.005) & (results['auc_delta'] >= -0.005)]
+    best = keeps_accuracy.loc[keeps_accuracy.groupby(['dataset', 'grade', 'variant'])['fit_seconds'].idxmin()]
+    print("\nFastest configuration keeping accuracy/AUC within 0.5 pt of the current one:")
+    print(best[['dataset', 'grade', 'variant', 'solver', 'tol', 'dtype', 'scale', 'fit_seconds', 'speedup']].round(4).to_string(index=False))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# Stratified k-fold evaluation of the grade-level track models.
+#
+# Usage:
+#   python -m utils.cross_validation --grade 10 --variant balanced --folds 5 --workers 4
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+from utils.dataloader import DEFAULT_PATH, columns_for_grade, load_data
+from utils.evaluation import evaluate_model
+from utils.logistic_regression import LogisticModel
+from utils.model_registry import default_registry
+from utils.pipeline import VARIANTS, cumulative_features
+from utils.pipeline_cache import PipelineCache
+
+DEFAULT_FOLDS = 5
+
+cv_cache = PipelineCache()
+
+
+class FoldModel:
+    """Minimal stand-in for LogisticModel so evaluate_model can read the fold estimator's classes."""
+
+    def __init__(self, estimator):
+        self.model = estimator
+
+
+class CrossValidationResult:
+    """Per-fold and aggregate evaluate_model outputs for one grade level and model variant.
+
+    aggregate is evaluated on the pooled out-of-fold predictions, so its
+    confusion matrix is the sum of the per-fold matrices.
+    """
+
+    def __init__(self, grade, variant, features, folds, aggregate, fold_summary, seconds):
+        self.grade = grade
+        self.variant = variant
+        self.features = features
+        self.folds = folds
+        self.aggregate = aggregate
+        self.fold_summary = fold_summary
+        self.seconds = seconds
+
+    @property
+    def mean_accuracy(self):
+        return self.fold_summary['accuracy'].mean()
+
+    @property
+    def std_accuracy(self):
+        return self.fold_summary['accuracy'].std(ddof=0)
+
+    @property
+    def mean_auc(self):
+        return self.fold_summary['roc_auc'].mean()
+
+    @property
+    def std_auc(self):
+        return self.fold_summary['roc_auc'].std(ddof=0)
+
+
+def _fit_fold(estimator, X, y, train_index, test_index, scale):
+    # X is the shared matrix; joblib memory-maps it into the workers instead of copying it per fold
+    X_train, X_test = X[train_index], X[test_index]
+    if scale:
+        scaler = StandardScaler().fit(X_train)
+        X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+
+    estimator = clone(estimator)
+    estimator.fit(X_train, y[train_index])
+    return estimator, estimator.predict(X_test), estimator.predict_proba(X_test)
+
+
+def cross_validate(df, grade, variant='baseline', target_column='track', n_splits=DEFAULT_FOLDS, workers=None, scale=False, params=None):
+    """Stratified k-fold evaluation of a grade model, with the folds fit in parallel workers.
+
+    Features are selected and encoded once and every fold indexes the same
+    matrix. Each fold is scored with evaluate_model, as are the pooled
+    out-of-fold predictions.
+    """
+    start = time.perf_counter()
+    features = cumulative_features(df, grade, target_column)
+
+    class_weight = 'balanced' if variant == 'balanced' else None
+    model = LogisticModel(df, target_column, registry=None, class_weight=class_weight, scale=scale, params=params)
+    data = model.prepare_data(grade, features)
+    X = np.asarray(data['X'], dtype=float)
+    y = np.asarray(data['y'].astype(str))
+
+    splits = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, y))
+    workers = workers or min(n_splits, os.cpu_count() or 1)
+    fitted = Parallel(n_jobs=workers)(
+        delayed(_fit_fold)(model.model, X, y, train_index, test_index, scale)
+        for train_index, test_index in splits
+    )
+
+    folds, rows = [], []
+    oof_pred = np.empty(len(y), dtype=object)
+    oof_proba = None
+    for fold, ((train_index, test_index), (estimator, y_pred, y_proba)) in enumerate(zip(splits, fitted), start=1):
+        results = evaluate_model(y[test_index], y_pred, y_proba, FoldModel(estimator))
+        folds.append(results)
+        rows.append({
+            'fold': fold,
+            'n_train': len(train_index),
+            'n_test': len(test_index),
+            'accuracy': results['accuracy'],
+            'roc_auc': results['roc_auc'],
+            'n_iter': int(np.max(estimator.n_iter_)),
+        })
+
+        if oof_proba is None:
+            oof_proba = np.empty((len(y), y_proba.shape[1]))
+        oof_pred[test_index] = y_pred
+        oof_proba[test_index] = y_proba
+
+    # Every fold sees every class (stratified), so the first fold's class order holds for all
+    aggregate = evaluate_model(y, oof_pred.astype(str), oof_proba, FoldModel(fitted[0][0]))
+
+    return CrossValidationResult(
+        grade, variant, features, folds, aggregate, pd.DataFrame(rows).set_index('fold'), time.perf_counter() - start
+    )
+
+
+def _registry_key(df, grade, variant, target_column, n_splits, scale, params):
+    fingerprint = df.attrs['fingerprint']
+    parts = ['cross_validation', fingerprint[3], len(df), grade, variant, target_column, n_splits, scale, params]
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def run_cross_validation(grade, variant='baseline', target_column='track', path=DEFAULT_PATH, n_splits=DEFAULT_FOLDS,
+                         workers=None, scale=False, tuned=False, cache=cv_cache, registry=default_registry):
+    """Cached cross_validate for a dataset file.
+
+    Results are kept in process (keyed by the dataset fingerprint) and in the
+    model registry on disk, so reruns and restarts don't refit the folds.
+    tuned=True evaluates the hyperparameters saved by utils.tuning, as run_pipeline does.
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown model variant '{variant}'. Expected one of: {', '.join(VARIANTS)}")
+
+    df = load_data(path, columns=columns_for_grade(grade, target_column))
+
+    params = None
+    if tuned:
+        from utils.tuning import load_tuned_params
+
+        saved = load_tuned_params(df, grade, target_column)
+        if saved is not None:
+            params, scale = saved[variant], True
+
+    key = (df.attrs['fingerprint'], grade, variant, target_column, n_splits, scale, repr(params))
+
+    def compute():
+        registry_key = _registry_key(df, grade, variant, target_column, n_splits, scale, params) if registry is not None else None
+        result = registry.load(registry_key) if registry_key else None
+        if result is None:
+            result = cross_validate(df, grade, variant, target_column, n_splits, workers, scale, params)
+            if registry_key:
+                registry.save(registry_key, result)
+        return result
+
+    return cache.get_or_compute(key, compute)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stratified k-fold evaluation of a grade-level track model.")
+    parser.add_argument('--grade', type=int, choices=[7, 8, 9, 10], required=True)
+    parser.add_argument('--variant', choices=VARIANTS, default='baseline')
+    parser.add_argument('--train-data', default=DEFAULT_PATH)
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--workers', type=int, default=None, help="Parallel fold workers (default: one per fold, up to the CPU count)")
+    parser.add_argument('--scale', action='store_true', help="Standardise features before fitting")
+    parser.add_argument('--tuned', action='store_true', help="Use the hyperparameters saved by utils.tuning")
+    args = parser.parse_args(argv)
+
+    result = run_cross_validation(args.grade, args.variant, path=args.train_data, n_splits=args.folds,
+                                  workers=args.workers, scale=args.scale, tuned=args.tuned)
+    print(result.fold_summary.round(4).to_string())
+    print(f"Accuracy {result.mean_accuracy:.4f} ± {result.std_accuracy:.4f}, AUC {result.mean_auc:.4f} ± {result.std_auc:.4f} "
+          f"({result.seconds:.2f}s)")
+    print(result.aggregate['confusion_matrix_df'].to_string())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,205 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 
-def load_data(path='data/student_data_2.csv'):
+# Frames from load_data share the cached column buffers; copy-on-write gives a
+# caller that writes to one its own copy of that column instead of changing
+# the cached frame every other caller and session sees
+pd.set_option('mode.copy_on_write', True)
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # projected loads fall back to CSV usecols
+    pq = None
+
+GRADE_LEVELS = [7, 8, 9, 10]
+SUBJECTS = ['filipino', 'english', 'math', 'science', 'ap', 'tle', 'mapeh', 'esp', 'average']
+CATEGORICAL_COLUMNS = ['gender', 'track', 'strand']
+
+# Declared column types for the student files; columns not listed keep pandas defaults
+# Nullable integer age, so a blank age loads as <NA> and is dropped later like any missing value
+SCHEMA = {'age': 'Int8'}
+SCHEMA.update({col: 'category' for col in CATEGORICAL_COLUMNS})
+SCHEMA.update({f"g{g}_{subject}": 'float32' for g in GRADE_LEVELS for subject in SUBJECTS})
+
+DEFAULT_PATH = 'data/student_data_2.csv'
+STRAND_DATA_PATH = 'data/synthetic_student_data_with_strand_ave.csv'
+COLUMNAR_CACHE_DIR = '.cache'
+DEFAULT_CHUNKSIZE = 50_000
+
+# Bytes before a previous end of file that must be unchanged for the file to count as appended to
+TAIL_BYTES = 4096
+
+# Parsed datasets shared by every page and session, keyed by file fingerprint
+MAX_CACHED_DATASETS = 8
+
+_cache = OrderedDict()
+_hashes = {}
+_lock = threading.Lock()
+
+
+def _content_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(path):
+    """Returns (path, size, mtime, content hash) identifying the file's current contents."""
+    abs_path = os.path.abspath(path)
+    stat = os.stat(abs_path)
+    stat_key = (abs_path, stat.st_size, stat.st_mtime_ns)
+
+    # Only re-hash the file when its size or mtime changed
+    with _lock:
+        content_hash = _hashes.get(stat_key)
+    if content_hash is None:
+        content_hash = _content_hash(abs_path)
+        with _lock:
+            for key in [k for k in _hashes if k[0] == abs_path]:
+                del _hashes[key]
+            _hashes[stat_key] = content_hash
+
+    return stat_key + (content_hash,)
+
+
+def _read_csv(path, columns=None):
+    # utf-8-sig strips the BOM that otherwise ends up in the 'age' header
+    return pd.read_csv(path, dtype=SCHEMA, encoding='utf-8-sig', usecols=columns)
+
+
+def columns_for_grade(grade_level, target_column='track'):
+    """Columns needed to select features and train a model for grades 7 up to grade_level."""
+    grade_columns = [f"g{g}_{subject}" for g in GRADE_LEVELS if g <= grade_level for subject in SUBJECTS]
+    return grade_columns + ['age', 'gender', target_column]
+
+
+def _columnar_copy(path, fingerprint):
+    """Returns a Parquet copy of the CSV for this fingerprint, writing it on first use."""
+    abs_path, content_hash = fingerprint[0], fingerprint[3]
+    stem = os.path.splitext(os.path.basename(abs_path))[0]
+    cache_dir = os.path.join(os.path.dirname(abs_path), COLUMNAR_CACHE_DIR)
+    cache_path = os.path.join(cache_dir, f"{stem}-{content_hash[:16]}.parquet")
+
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        for name in os.listdir(cache_dir):
+            if name.startswith(f"{stem}-") and name.endswith('.parquet'):
+                os.remove(os.path.join(cache_dir, name))
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        _read_csv(path).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+
+    return cache_path
+
+
+def _read_columns(path, fingerprint, columns):
+    if pq is not None:
+        try:
+            cache_path = _columnar_copy(path, fingerprint)
+        except OSError:
+            cache_path = None
+        if cache_path is not None:
+            available = set(pq.read_schema(cache_path).names)
+            return pd.read_parquet(cache_path, columns=[c for c in columns if c in available])
+
+    available = set(pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns)
+    df = _read_csv(path, columns=[c for c in columns if c in available])
+    return df[[c for c in columns if c in available]]
+
+
+def load_data(path=DEFAULT_PATH, grade=None, columns=None):
+    """Returns the shared, read-only frame for path.
+
+    Passing a grade level (or an explicit column list) reads only those columns
+    from a columnar copy of the file instead of parsing the whole CSV.
+    """
     try:
-        df = pd.read_csv(path)
-        return df
+        fingerprint = dataset_fingerprint(path)
+        if grade is not None:
+            columns = columns_for_grade(grade)
+        key = (fingerprint, tuple(columns) if columns is not None else None)
+
+        with _lock:
+            df = _cache.get(key)
+            if df is not None:
+                _cache.move_to_end(key)
+
+        if df is None:
+            df = _read_csv(path) if columns is None else _read_columns(path, fingerprint, columns)
+            df.attrs['fingerprint'] = fingerprint
+            with _lock:
+                _cache[key] = df
+                _cache.move_to_end(key)
+                while len(_cache) > MAX_CACHED_DATASETS:
+                    _cache.popitem(last=False)
+
+        # Shallow copy: callers share the parsed columns, and copy-on-write keeps their writes off the cached frame
+        return df.copy(deep=False)
     except FileNotFoundError:
         raise FileNotFoundError(f"🚫 File not found at path: {path}")
     except Exception as e:
         raise RuntimeError(f"⚠️ Failed to load data: {e}")
+
+
+def iter_chunks(path=DEFAULT_PATH, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """Yields the file as typed frames of at most chunksize rows, without loading it whole."""
+    if columns is not None:
+        available = set(pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns)
+        columns = [c for c in columns if c in available]
+
+    try:
+        reader = pd.read_csv(path, dtype=SCHEMA, encoding='utf-8-sig', usecols=columns, chunksize=chunksize)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"🚫 File not found at path: {path}")
+
+    with reader:
+        for chunk in reader:
+            yield chunk if columns is None else chunk[columns]
+
+
+def read_appended(path, offset, columns=None):
+    """Parses only the rows appended to the file after byte offset (a previous end of file).
+
+    Returns (rows, new end offset), so the next call picks up where this one
+    stopped; reading cost depends on the appended bytes, not the file size.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = pd.read_csv(f, nrows=0, encoding='utf-8-sig').columns
+            end = os.fstat(f.fileno()).st_size
+            if end < offset:
+                raise ValueError(f"file is shorter than the last read offset ({end} < {offset}); it was rewritten, not appended to")
+            f.seek(offset)
+            delta = f.read(end - offset)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"🚫 File not found at path: {path}")
+
+    if columns is not None:
+        columns = [c for c in columns if c in header]
+    if not delta.strip():
+        df = pd.DataFrame({c: pd.Series(dtype=SCHEMA.get(c, 'object')) for c in (columns or header)})
+        return df, end
+
+    df = pd.read_csv(io.BytesIO(delta), names=header, header=None, dtype=SCHEMA, usecols=columns)
+    return (df if columns is None else df[columns]), end
+
+
+def tail_digest(path, offset):
+    """Hash of the TAIL_BYTES before offset; if it changes, the file was rewritten rather than appended to."""
+    start = max(offset - TAIL_BYTES, 0)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _hashes.clear()
@@ -1,22 +1,73 @@
 import pandas as pd
 import numpy as np
+from scipy.stats import rankdata
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report, roc_curve, auc
 
+
+def one_vs_rest_auc(y_test, y_proba, classes):
+    """AUC of every class against the rest, from one ranking of all probability columns.
+
+    Uses the rank-sum (Mann-Whitney) form of AUC, so all classes are scored
+    with a single rankdata call instead of one ROC computation per class.
+    """
+    onehot = np.asarray(y_test)[:, None] == np.asarray(classes)[None, :]
+    positives = onehot.sum(axis=0)
+    negatives = len(onehot) - positives
+    ranks = rankdata(y_proba, axis=0)
+    rank_sums = (ranks * onehot).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (rank_sums - positives * (positives + 1) / 2) / (positives * negatives)
+
+
+def one_vs_rest_roc(y_test, y_proba, classes):
+    """(fpr, tpr) curve points for every class against the rest, as (n + 1, k) arrays.
+
+    All columns are sorted at once and the true/false positive counts come
+    from one cumulative sum over the one-hot labels.
+    """
+    onehot = np.asarray(y_test)[:, None] == np.asarray(classes)[None, :]
+    order = np.argsort(-y_proba, axis=0, kind='stable')
+    hits = np.take_along_axis(onehot, order, axis=0)
+
+    tp = np.vstack([np.zeros((1, len(classes))), np.cumsum(hits, axis=0)])
+    fp = np.vstack([np.zeros((1, len(classes))), np.cumsum(~hits, axis=0)])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return fp / fp[-1], tp / tp[-1]
+
+
+def per_class_confusion(cm, labels):
+    """One-vs-rest TP/FP/FN/TN counts for every class, from the full confusion matrix."""
+    tp = np.diag(cm)
+    fp = cm.sum(axis=0) - tp
+    fn = cm.sum(axis=1) - tp
+    tn = cm.sum() - tp - fp - fn
+    return pd.DataFrame({'TP': tp, 'FP': fp, 'FN': fn, 'TN': tn}, index=pd.Index(labels, name='Class'))
+
+
 def evaluate_model(y_test, y_pred, y_proba, model):
     accuracy = accuracy_score(y_test, y_pred)
-    class_report = classification_report(y_test, y_pred, output_dict=True)
+    class_report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
 
-    cm = confusion_matrix(y_test, y_pred)
-    labels = model.model.classes_  # ['Academic', 'TVL']
+    labels = model.model.classes_  # ['Academic', 'TVL'], or the strands
+    cm = confusion_matrix(y_test, y_pred, labels=labels)
     cm_df = pd.DataFrame(cm, index=[f"Actual: {label}" for label in labels],
                             columns=[f"Predicted: {label}" for label in labels])
 
     # ROC/AUC
     unique_classes = np.unique(y_test)
+    roc_curves_ovr, roc_auc_ovr = None, None
     if len(unique_classes) == 2:
         pos_class_index = list(model.model.classes_).index(unique_classes[1])
         fpr, tpr, _ = roc_curve(y_test, y_proba[:, pos_class_index], pos_label=unique_classes[1])
         roc_auc = auc(fpr, tpr)
+    elif len(unique_classes) > 2:
+        # One-vs-rest per class; roc_auc is their macro average
+        fpr, tpr = None, None
+        class_auc = one_vs_rest_auc(y_test, y_proba, labels)
+        all_fpr, all_tpr = one_vs_rest_roc(y_test, y_proba, labels)
+        roc_auc_ovr = pd.Series(class_auc, index=labels, name='AUC')
+        roc_curves_ovr = {label: (all_fpr[:, i], all_tpr[:, i]) for i, label in enumerate(labels)}
+        roc_auc = float(np.nanmean(class_auc))
     else:
         fpr, tpr, roc_auc = None, None, None
 
@@ -24,6 +75,9 @@ def evaluate_model(y_test, y_pred, y_proba, model):
         'accuracy': accuracy,
         'classification_report': pd.DataFrame(class_report).transpose(),
         'confusion_matrix_df': cm_df,
+        'per_class_confusion': per_class_confusion(cm, labels),
         'roc_curve': (fpr, tpr),
-        'roc_auc': roc_auc
+        'roc_auc': roc_auc,
+        'roc_curves_ovr': roc_curves_ovr,
+        'roc_auc_ovr': roc_auc_ovr,
     }
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from scipy import special
+from scipy.stats import chi2_contingency
+
+from utils.dataloader import DEFAULT_CHUNKSIZE, DEFAULT_PATH, columns_for_grade
+from utils.streaming import stream_data
+
+
+class StreamingFeatureScorer:
+    """One-pass ANOVA F-scores and chi-square p-values from per-class sufficient statistics.
+
+    Numerical features keep count, sum and sum of squares per class; categorical
+    features keep a contingency table against the target. Both are additive, so
+    chunks can be fed in any order and scorers built on different parts of the
+    data can be merged. The scores match FeatureSelector.select_features.
+    """
+
+    def __init__(self, target_column, features=None):
+        self.target_column = target_column
+        self.features = features
+        self.numerical = None
+        self.categorical = None
+        # Sums are taken around a per-feature shift (the first chunk's mean) to avoid cancellation
+        self.shift = None
+        self.moments = None
+        self.contingency = {}
+        self.rows = 0
+
+    def _init_features(self, chunk):
+        features = self.features
+        if features is None:
+            features = [col for col in chunk.columns if col != self.target_column]
+        self.features = list(features)
+        self.numerical = [f for f in self.features if pd.api.types.is_numeric_dtype(chunk[f])]
+        self.categorical = [f for f in self.features if f not in self.numerical]
+        self.shift = chunk[self.numerical].astype("float64").mean().fillna(0.0)
+
+    def update(self, chunk):
+        if self.numerical is None:
+            self._init_features(chunk)
+
+        y = chunk[self.target_column]
+        self.rows += len(chunk)
+
+        if self.numerical:
+            values = chunk[self.numerical].astype("float64") - self.shift
+            partial = pd.concat(
+                {"n": values.notna(), "sum": values, "sumsq": values ** 2}, axis=1
+            ).groupby(y, observed=True).sum()
+            self.moments = partial if self.moments is None else self.moments.add(partial, fill_value=0)
+
+        for feature in self.categorical:
+            table = pd.crosstab(chunk[feature], y)
+            if feature in self.contingency:
+                table = self.contingency[feature].add(table, fill_value=0)
+            self.contingency[feature] = table
+
+        return self
+
+    def merge(self, other):
+        """Adds the statistics of another scorer (e.g. one built on newly appended rows)."""
+        if other.numerical is None:
+            return self
+        if self.numerical is None:
+            self.features, self.numerical, self.categorical = other.features, other.numerical, other.categorical
+            self.shift = other.shift
+
+        if other.moments is not None:
+            # Re-centre the other scorer's sums on this scorer's shift
+            d = other.shift - self.shift
+            n, s, q = other.moments["n"], other.moments["sum"], other.moments["sumsq"]
+            shifted = pd.concat({"n": n, "sum": s + n * d, "sumsq": q + 2 * d * s + n * d ** 2}, axis=1)
+            self.moments = shifted if self.moments is None else self.moments.add(shifted, fill_value=0)
+
+        for feature, table in other.contingency.items():
+            if feature in self.contingency:
+                table = self.contingency[feature].add(table, fill_value=0)
+            self.contingency[feature] = table
+
+        self.rows += other.rows
+        return self
+
+    def anova(self):
+        """F-scores and p-values for the numerical features, computed like sklearn's f_classif."""
+        n_k = self.moments["n"]
+        s_k = self.moments["sum"]
+        q_k = self.moments["sumsq"]
+
+        n = n_k.sum()
+        s = s_k.sum()
+        n_classes = (n_k > 0).sum()
+
+        ss_total = q_k.sum() - s ** 2 / n
+        ss_between = (s_k ** 2 / n_k.where(n_k > 0)).sum() - s ** 2 / n
+        ss_within = ss_total - ss_between
+
+        df_between = n_classes - 1
+        df_within = n - n_classes
+        f_values = (ss_between / df_between) / (ss_within / df_within)
+        p_values = pd.Series(special.fdtrc(df_between, df_within, f_values), index=f_values.index)
+        return f_values, p_values
+
+    def chi_square(self, feature):
+        chi2, p, dof, expected = chi2_contingency(self.contingency[feature])
+        return p
+
+    def scores(self):
+        """Returns the score table in the same layout as FeatureSelector.scores_per_grade."""
+        scores_df = pd.DataFrame(np.nan, index=pd.Index(self.features, name="Feature"), columns=["F-Score", "P-Value"])
+
+        if self.numerical:
+            f_values, p_values = self.anova()
+            scores_df.loc[self.numerical, "F-Score"] = f_values[self.numerical]
+            scores_df.loc[self.numerical, "P-Value"] = p_values[self.numerical]
+
+        for feature in self.categorical:
+            scores_df.loc[feature, "P-Value"] = self.chi_square(feature)
+
+        return scores_df
+
+    def significant_features(self, alpha=0.05):
+        scores_df = self.scores()
+        return scores_df[scores_df["P-Value"] < alpha].index.tolist()
+
+
+def score_file(grade_level, target_column="track", path=DEFAULT_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    """Scores the features for a grade level by streaming the file in chunks."""
+    scorer = StreamingFeatureScorer(target_column)
+    stream_data([scorer], path=path, chunksize=chunksize, columns=columns_for_grade(grade_level, target_column))
+    return scorer
@@ -1,14 +1,47 @@
 from sklearn.preprocessing import StandardScaler
 from sklearn.feature_selection import f_classif
 from scipy.stats import chi2_contingency
+from collections import OrderedDict
+import threading
+
+import numpy as np
 import pandas as pd
 
+# Per-feature (F-Score, P-Value) shared by every FeatureSelector, keyed by dataset fingerprint
+MAX_CACHED_DATASETS = 8
+
+_score_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _shared_scores(df, target_column):
+    fingerprint = df.attrs.get("fingerprint")
+    if fingerprint is None:
+        return {}
+
+    key = (fingerprint, len(df), target_column)
+    with _cache_lock:
+        if key not in _score_cache:
+            _score_cache[key] = {}
+        _score_cache.move_to_end(key)
+        while len(_score_cache) > MAX_CACHED_DATASETS:
+            _score_cache.popitem(last=False)
+        return _score_cache[key]
+
+
+def clear_score_cache():
+    with _cache_lock:
+        _score_cache.clear()
+
+
 class FeatureSelector:
     def __init__(self, df, target_column):
-        self.df = df.copy()
+        # The selector only reads from df, so a shallow copy is enough
+        self.df = df.copy(deep=False)
         self.target_column = target_column
         self.scores_per_grade = {}
         self.significant_features = {}
+        self.feature_scores = _shared_scores(self.df, target_column)
 
     def chi_square_test(self, feature_col, target_col):
         if feature_col not in self.df.columns or target_col not in self.df.columns:
@@ -29,36 +62,17 @@ class FeatureSelector:
         additional_features = ["age", "gender"]
         features = grade_columns + [f for f in additional_features if f in self.df.columns]
 
-        print("Available grade columns:", grade_columns)
-        print("Available columns:", self.df.columns)
-
-        # Prepare data for feature selection
-        X = self.df[features]
-        y = self.df[self.target_column]
-
-        # Store the feature scores
-        scores_df = pd.DataFrame(columns=["Feature", "F-Score", "P-Value"])
+        # Only score features not already scored for this dataset (by an earlier grade or page)
+        missing = [f for f in features if f not in self.feature_scores]
+        if missing:
+            self.feature_scores.update(self._score_features(missing))
 
-        for feature in X.columns:
-            if X[feature].dtype in ["float64", "int64"]:  # Numerical feature
-                # Scale numerical features before ANOVA
-                X_scaled = X[feature].values.reshape(-1, 1)
-                X_scaled = StandardScaler().fit_transform(X_scaled)
-                
-                # Perform ANOVA (f_classif) for numerical features
-                f_values, p_values = f_classif(X_scaled, y)
-                temp_df = pd.DataFrame({"Feature": [feature], "F-Score": [f_values[0]], "P-Value": [p_values[0]]})
-                scores_df = pd.concat([scores_df, temp_df], ignore_index=True)
-                
-            else:  # Categorical feature (e.g., gender)
-                # Perform Chi-Square test for categorical features
-                print(f"Chi-Square test for: {feature} with target: {self.target_column}")
-                p_value = self.chi_square_test(feature, self.target_column)
-                temp_df = pd.DataFrame({"Feature": [feature], "F-Score": [None], "P-Value": [p_value]})
-                scores_df = pd.concat([scores_df, temp_df], ignore_index=True)
-
-        # Set the feature as the index
-        scores_df.set_index("Feature", inplace=True)
+        # Build the score table once, indexed by feature
+        scores_df = pd.DataFrame(
+            [self.feature_scores[f] for f in features],
+            columns=["F-Score", "P-Value"],
+            index=pd.Index(features, name="Feature"),
+        )
 
         # Store all scores for this grade level
         self.scores_per_grade[grade_level] = scores_df
@@ -68,3 +82,35 @@ class FeatureSelector:
         self.significant_features[grade_level] = sig_features
 
         return sig_features
+
+    def _score_features(self, features):
+        X = self.df[features]
+        y = self.df[self.target_column]
+
+        numerical = [f for f in features if pd.api.types.is_numeric_dtype(X[f])]
+        categorical = [f for f in features if f not in numerical]
+
+        scores = {}
+        if numerical:
+            X_numerical = np.asfortranarray(X[numerical].to_numpy(dtype="float64"))
+            gaps = np.isnan(X_numerical).any(axis=0)
+
+            # Scale all complete numerical features at once, then run ANOVA (f_classif) over the whole matrix
+            complete = [f for f, gap in zip(numerical, gaps) if not gap]
+            if complete:
+                X_scaled = np.asfortranarray(StandardScaler().fit_transform(X_numerical[:, ~gaps]))
+                f_values, p_values = f_classif(X_scaled, y)
+                scores.update(zip(complete, zip(f_values, p_values)))
+
+            # Features with missing values are scored on their own non-missing rows, like StreamingFeatureScorer
+            for i in np.flatnonzero(gaps):
+                present = ~np.isnan(X_numerical[:, i])
+                X_scaled = StandardScaler().fit_transform(X_numerical[present, i].reshape(-1, 1))
+                f_values, p_values = f_classif(X_scaled, y[present])
+                scores[numerical[i]] = (f_values[0], p_values[0])
+
+        # Chi-Square test for categorical features (e.g., gender)
+        for feature in categorical:
+            scores[feature] = (np.nan, self.chi_square_test(feature, self.target_column))
+
+        return scores
@@ -0,0 +1,173 @@
+# Training of every grade-level model in one go (e.g. after a data update).
+#
+# Usage:
+#   python -m utils.grade_training train-all --workers 4 --compare
+#   python -m utils.grade_training cascade --variant balanced --scale
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sklearn.metrics import accuracy_score
+
+from utils.dataloader import DEFAULT_PATH, GRADE_LEVELS, columns_for_grade, load_data
+from utils.feature_selection import clear_score_cache
+from utils.logistic_regression import LogisticModel
+from utils.model_registry import MODEL_DIR, ModelRegistry
+from utils.pipeline import VARIANTS, build_pipeline, cumulative_features
+
+
+def _train_grade(path, grade, target_column, registry):
+    start = time.perf_counter()
+    # With fork the parent's parsed frames are inherited copy-on-write, so this is an in-memory cache hit
+    df = load_data(path, columns=columns_for_grade(grade, target_column))
+    results = build_pipeline(df, grade, target_column, registry=registry)
+
+    summary = {'grade': grade, 'features': len(results['baseline'].features), 'seconds': time.perf_counter() - start}
+    for variant, result in results.items():
+        summary[f'{variant}_accuracy'] = accuracy_score(result.model.y_test, result.y_pred)
+    return summary
+
+
+def _pool_context():
+    # fork shares the already-loaded data with the workers; other platforms reload it from the Parquet copy
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def train_all_grades(path=DEFAULT_PATH, target_column='track', workers=None, registry=None, grades=GRADE_LEVELS):
+    """Fits the feature selection, baseline and balanced models for every grade in a process pool.
+
+    Models are written to the registry (retrained even if already present), so
+    the pages pick them up on their next run. Returns (per-grade summaries, seconds).
+    """
+    registry = registry or ModelRegistry(MODEL_DIR, refresh=True)
+    workers = workers or min(len(grades), os.cpu_count() or 1)
+
+    # Parse once in the parent before the pool starts
+    for grade in grades:
+        load_data(path, columns=columns_for_grade(grade, target_column))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        futures = [pool.submit(_train_grade, path, grade, target_column, registry) for grade in grades]
+        summaries = [future.result() for future in futures]
+    return summaries, time.perf_counter() - start
+
+
+def train_all_grades_sequential(path=DEFAULT_PATH, target_column='track', registry=None, grades=GRADE_LEVELS):
+    """Same work as train_all_grades in the current process, for speed-up comparisons.
+
+    Nothing is persisted unless a registry is passed.
+    """
+    for grade in grades:
+        load_data(path, columns=columns_for_grade(grade, target_column))
+
+    start = time.perf_counter()
+    summaries = [_train_grade(path, grade, target_column, registry) for grade in grades]
+    return summaries, time.perf_counter() - start
+
+
+def train_cascade(path=DEFAULT_PATH, target_column='track', variant='baseline', registry=None, grades=GRADE_LEVELS, scale=False):
+    """Trains the grade models in order (G7 -> G10), seeding each from the previous grade.
+
+    Each grade's feature set extends the previous one (cumulative selection), so
+    the previous coefficients are reused as the starting point and the new
+    features start at zero. Every grade is also fit from a cold start to report
+    solver iterations and time saved; both are timed on the estimator fit alone.
+    Nothing is persisted unless a registry is passed, so every run really fits.
+    Returns (warm-started models, summaries).
+    """
+    class_weight = 'balanced' if variant == 'balanced' else None
+    models, summaries = {}, []
+    previous = None
+
+    for grade in grades:
+        df = load_data(path, columns=columns_for_grade(grade, target_column))
+        features = cumulative_features(df, grade, target_column)
+
+        cold = LogisticModel(df, target_column, registry=None, class_weight=class_weight, scale=scale)
+        data = cold.prepare_data(grade, features)
+        cold.fit_prepared(data, grade, features)
+
+        warm = LogisticModel(df, target_column, registry=registry, class_weight=class_weight, scale=scale)
+        warm.model.set_params(warm_start=True)
+        init_coef = previous.coefficients_for(features) if previous is not None else None
+        warm.fit_prepared(data, grade, features, init_coef=init_coef)
+
+        models[grade] = warm
+        previous = warm
+        summaries.append({
+            'grade': grade,
+            'features': len(features),
+            'cold_iterations': cold.n_iter,
+            'warm_iterations': warm.n_iter,
+            'cold_seconds': cold.fit_seconds,
+            'warm_seconds': warm.fit_seconds,
+            'cold_accuracy': accuracy_score(cold.y_test, cold.y_pred),
+            'warm_accuracy': accuracy_score(warm.y_test, warm.y_pred),
+        })
+
+    return models, summaries
+
+
+def _print_summaries(summaries):
+    for s in summaries:
+        print(
+            f"  Grade {s['grade']:>2}: {s['features']:>2} features, "
+            f"baseline acc {s['baseline_accuracy']:.3f}, balanced acc {s['balanced_accuracy']:.3f}, "
+            f"{s['seconds']:.2f}s"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the models for every grade level.")
+    parser.add_argument('--train-data', default=DEFAULT_PATH)
+    parser.add_argument('--target', default='track')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train_all = commands.add_parser('train-all', help="Train grades 7-10 in parallel and save them to the registry")
+    train_all.add_argument('--workers', type=int, default=None)
+    train_all.add_argument('--compare', action='store_true', help="Also time sequential training and report the speed-up")
+
+    cascade = commands.add_parser('cascade', help="Warm-start each grade from the previous one and compare with cold starts")
+    cascade.add_argument('--variant', choices=VARIANTS, default='baseline')
+    cascade.add_argument('--scale', action='store_true', help="Standardise features before fitting")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'cascade':
+        _, summaries = train_cascade(args.train_data, args.target, args.variant, scale=args.scale)
+        for s in summaries:
+            print(
+                f"  Grade {s['grade']:>2}: {s['features']:>2} features, "
+                f"iterations {s['cold_iterations']:>4} cold / {s['warm_iterations']:>4} warm, "
+                f"fit {s['cold_seconds'] * 1000:.0f} ms cold / {s['warm_seconds'] * 1000:.0f} ms warm, "
+                f"accuracy {s['cold_accuracy']:.3f} / {s['warm_accuracy']:.3f}"
+            )
+        saved = sum(s['cold_seconds'] - s['warm_seconds'] for s in summaries)
+        total = sum(s['cold_seconds'] for s in summaries)
+        print(f"Warm starts saved {saved:.2f}s of {total:.2f}s ({saved / total:.0%})")
+        return 0
+
+    if args.compare:
+        # Time the sequential run without touching the registry. Both runs start with no feature scores
+        # cached: forked workers would otherwise inherit the sequential run's and skip scoring
+        clear_score_cache()
+        _, sequential_seconds = train_all_grades_sequential(args.train_data, args.target)
+        clear_score_cache()
+
+    summaries, parallel_seconds = train_all_grades(args.train_data, args.target, workers=args.workers)
+    print(f"Trained {len(summaries)} grade models in {parallel_seconds:.2f}s")
+    _print_summaries(summaries)
+
+    if args.compare:
+        print(f"Sequential: {sequential_seconds:.2f}s, parallel: {parallel_seconds:.2f}s, speed-up {sequential_seconds / parallel_seconds:.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# Two-stage strand prediction: Academic vs TVL first, then a strand model for the predicted track.
+#
+# Usage:
+#   python -m utils.hierarchical --grade 10 --compare --rows 1000000
+#   python -m utils.hierarchical --grade 10 --input students.csv --output strands.parquet
+import argparse
+import hashlib
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score
+
+from utils.batch_scoring import ChunkScorer, score_file
+from utils.dataloader import DEFAULT_CHUNKSIZE, STRAND_DATA_PATH, columns_for_grade, load_data
+from utils.logistic_regression import LogisticModel
+from utils.model_registry import default_registry
+from utils.pipeline import cumulative_features
+
+
+def _derive_fingerprint(subset, df, tag):
+    """Gives subset a fingerprint of its own, so caches and the registry keep it apart from df."""
+    fingerprint = df.attrs.get('fingerprint')
+    if fingerprint is not None:
+        derived = hashlib.sha1(f"{fingerprint[3]}:{tag}".encode()).hexdigest()
+        subset.attrs['fingerprint'] = fingerprint[:3] + (derived,)
+    return subset
+
+
+def _track_subset(df, track, track_column='track', strand_column='strand'):
+    """Rows of one track, with their own fingerprint."""
+    subset = df[df[track_column] == track].copy(deep=False)
+    subset[strand_column] = subset[strand_column].cat.remove_unused_categories()
+    return _derive_fingerprint(subset, df, f"{track_column}={track}")
+
+
+class HierarchicalStrandModel:
+    """Predicts the track, then the strand with a model trained only on that track's strands.
+
+    Stage two holds one LogisticModel per track (three Academic strands, four
+    TVL strands), each fit on every training row of the track model that
+    belongs to its track, so every strand model sees a fraction of the rows
+    and classes of a flat model. The split is the track model's, so
+    test_index is unseen by both stages.
+    """
+
+    def __init__(self, df, registry=default_registry, class_weight=None, scale=True,
+                 track_column='track', strand_column='strand'):
+        self.df = df
+        self.registry = registry
+        self.class_weight = class_weight
+        self.scale = scale
+        self.track_column = track_column
+        self.strand_column = strand_column
+        self.track_model = None
+        self.strand_models = {}
+        self.fit_seconds = None
+
+    def train(self, grade):
+        start = time.perf_counter()
+        track_features = cumulative_features(self.df, grade, self.track_column)
+        # LogisticModel label-encodes gender on the frame it's given; keep self.df in raw labels
+        self.track_model = LogisticModel(self.df.copy(deep=False), self.track_column, registry=self.registry,
+                                         class_weight=self.class_weight, scale=self.scale)
+        data = self.track_model.prepare_data(grade, track_features)
+        self.track_model.fit_prepared(data, grade, track_features)
+        self.test_index = data['X_test'].index
+
+        # Strand models only see the track model's training rows
+        train_df = _derive_fingerprint(self.df.loc[data['X_train'].index], self.df, 'track-model-train')
+        for track in self.track_model.model.classes_:
+            subset = _track_subset(train_df, track, self.track_column, self.strand_column)
+            features = cumulative_features(subset, grade, self.strand_column)
+            model = LogisticModel(subset, self.strand_column, registry=self.registry,
+                                  class_weight=self.class_weight, scale=self.scale)
+            # No second split: test_index already holds out rows from both stages, so fit on every row
+            # of the track (the strand model's own test set is then its training rows)
+            strand_data = model.prepare_data(grade, features)
+            strand_data.update(X_train=strand_data['X'], y_train=strand_data['y'],
+                               X_test=strand_data['X'], y_test=strand_data['y'])
+            model.fit_prepared(strand_data, grade, features)
+            self.strand_models[track] = model
+
+        self.fit_seconds = time.perf_counter() - start
+        return self
+
+    def scorer(self):
+        return HierarchicalScorer(
+            ChunkScorer.from_model(self.track_model),
+            {track: ChunkScorer.from_model(model) for track, model in self.strand_models.items()},
+        )
+
+
+class HierarchicalScorer:
+    """Scores frames of students with the two stages; a drop-in for ChunkScorer in batch_scoring.score_file.
+
+    Students are grouped by predicted track and each group goes through its
+    strand model in one vectorised call.
+    """
+
+    def __init__(self, track_scorer, strand_scorers):
+        self.track_scorer = track_scorer
+        self.strand_scorers = strand_scorers
+
+    def score(self, chunk):
+        out = self.track_scorer.score(chunk)
+        track_probability = out['probability'].to_numpy()
+
+        strand = np.full(len(out), None, dtype=object)
+        strand_probability = np.full(len(out), np.nan)
+        tracks = out['predicted_track'].to_numpy()
+        for track, scorer in self.strand_scorers.items():
+            rows = np.flatnonzero(tracks == track)
+            if len(rows):
+                scored = scorer.score(chunk.iloc[rows])
+                strand[rows] = scored['predicted_track'].to_numpy()
+                strand_probability[rows] = scored['probability'].to_numpy()
+
+        out['predicted_strand'] = strand
+        # P(track) * P(strand | track) for the routed branch
+        out['probability'] = track_probability * strand_probability
+        return out
+
+
+def compare_with_flat(df, grade, rows=None, registry=None, scale=True):
+    """Accuracy, solver fit time and scoring throughput of the two-stage model against one flat strand model.
+
+    Both use the same train/test split. Scoring is timed on the test rows
+    tiled up to rows (if given) to show throughput at scale.
+    """
+    hierarchical = HierarchicalStrandModel(df, registry=registry, scale=scale).train(grade)
+    flat = LogisticModel(df.copy(deep=False), 'strand', registry=registry, scale=scale)
+    flat.train_model(grade, cumulative_features(df, grade, 'strand'))
+
+    stages = [hierarchical.track_model] + list(hierarchical.strand_models.values())
+
+    test = df.loc[hierarchical.test_index]
+    if rows:
+        test = test.iloc[np.resize(np.arange(len(test)), rows)].reset_index(drop=True)
+    timings = {}
+    for name, scorer in [('hierarchical', hierarchical.scorer()), ('flat', ChunkScorer.from_model(flat))]:
+        start = time.perf_counter()
+        scored = scorer.score(test)
+        timings[name] = time.perf_counter() - start
+        predicted = scored['predicted_strand'] if name == 'hierarchical' else scored['predicted_track']
+        timings[f'{name}_accuracy'] = accuracy_score(test['strand'].astype(str), predicted.astype(str))
+
+    return {
+        'hierarchical_fit_seconds': sum(model.fit_seconds for model in stages),
+        'flat_fit_seconds': flat.fit_seconds,
+        'hierarchical_accuracy': timings['hierarchical_accuracy'],
+        'flat_accuracy': timings['flat_accuracy'],
+        'hierarchical_score_seconds': timings['hierarchical'],
+        'flat_score_seconds': timings['flat'],
+        'scored_rows': len(test),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Two-stage track -> strand prediction.")
+    parser.add_argument('--grade', type=int, choices=[7, 8, 9, 10], required=True)
+    parser.add_argument('--train-data', default=STRAND_DATA_PATH)
+    parser.add_argument('--balanced', action='store_true', help="Use class-balanced models in both stages")
+    parser.add_argument('--compare', action='store_true', help="Compare with a flat seven-strand model")
+    parser.add_argument('--rows', type=int, default=None, help="Rows to score when timing the comparison")
+    parser.add_argument('--input', help="CSV file of students to score")
+    parser.add_argument('--output', help="Output .csv or .parquet file")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    df = load_data(args.train_data, columns=columns_for_grade(args.grade, 'track') + ['strand'])
+
+    if args.compare:
+        r = compare_with_flat(df, args.grade, rows=args.rows)
+        print(f"Fit:      two-stage {r['hierarchical_fit_seconds'] * 1000:.0f} ms, flat {r['flat_fit_seconds'] * 1000:.0f} ms")
+        print(f"Scoring {r['scored_rows']:,} rows: two-stage {r['hierarchical_score_seconds']:.3f}s, flat {r['flat_score_seconds']:.3f}s")
+        print(f"Strand accuracy: two-stage {r['hierarchical_accuracy']:.4f}, flat {r['flat_accuracy']:.4f}")
+
+    if args.input:
+        if not args.output:
+            parser.error("--output is required with --input")
+        model = HierarchicalStrandModel(df, class_weight='balanced' if args.balanced else None).train(args.grade)
+        rows, seconds = score_file(model.scorer(), args.input, args.output, chunksize=args.chunksize, workers=args.workers)
+        print(f"Scored {rows:,} rows in {seconds:.2f}s -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
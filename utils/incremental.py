@@ -0,0 +1,291 @@
+# Incremental updates of a grade model as new cohorts are appended to the dataset.
+#
+# Usage:
+#   python -m utils.incremental init --grade 10 --variant balanced
+#   python -m utils.incremental update --grade 10 --variant balanced     # after appending rows
+#   python -m utils.incremental check --grade 10 --variant balanced --rebase
+#   python -m utils.batch_scoring --grade 10 --variant balanced --incremental --input ... --output ...
+import argparse
+import hashlib
+import os
+import sys
+import threading
+import time
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from utils.dataloader import DEFAULT_PATH, columns_for_grade, load_data, read_appended, tail_digest
+from utils.logistic_regression import LogisticModel
+from utils.model_registry import MODEL_DIR
+from utils.pipeline import VARIANTS, cumulative_features
+
+INCREMENTAL_DIR = os.path.join(MODEL_DIR, 'incremental')
+
+# Every HOLDOUT_EVERY-th row of the file is never trained on and scores the full-refit check
+HOLDOUT_EVERY = 5
+
+# Run the full-refit check after this many updates, and flag drift past this accuracy gap
+CHECK_EVERY = 4
+MAX_ACCURACY_GAP = 0.02
+
+# Passes of partial_fit over each batch of new rows; more passes over a small cohort make the model forget older ones
+EPOCHS = 1
+
+# Inverse regularisation strength of the batch LogisticRegression the SGD model tracks
+C = 1.0
+
+
+class IncrementalGradeModel:
+    """A grade model trained with SGD (logistic loss) and updated from appended rows only.
+
+    Features, gender encoding and scaling are fixed when the model is
+    initialised so updates stay comparable. Class balancing uses running class
+    counts, since partial_fit can't take class_weight='balanced'. Exposes
+    model, feature_names, label_encoder and scaler like LogisticModel, so
+    ChunkScorer and LinearScorer work with it unchanged.
+    """
+
+    def __init__(self, path, grade, variant='baseline', target_column='track'):
+        self.path = os.path.abspath(path)
+        self.grade = grade
+        self.variant = variant
+        self.target_column = target_column
+        self.model = SGDClassifier(loss='log_loss', max_iter=1000, tol=1e-4, random_state=42)
+        self.scaler = None
+        self.label_encoder = LabelEncoder()
+        self.feature_names = []
+        self.class_counts = {}
+        self.offset = 0
+        self.tail = None
+        self.rows_seen = 0
+        self.updates_since_check = 0
+        self.history = []
+
+    @property
+    def store_path(self):
+        return incremental_path(self.path, self.grade, self.variant, self.target_column)
+
+    def _prepare(self, df, first_row):
+        """Encoded feature matrix, labels and file row numbers of the complete rows in df."""
+        df = df.dropna(subset=self.feature_names + [self.target_column])
+        X = df[self.feature_names].copy()
+        if 'gender' in self.feature_names:
+            X['gender'] = self.label_encoder.transform(X['gender'].astype(str))
+        rows = first_row + df.index.to_numpy()
+        return X.to_numpy(dtype=float), df[self.target_column].astype(str).to_numpy(), rows
+
+    def _sample_weight(self, y):
+        if self.variant != 'balanced':
+            return None
+        # 'balanced' weights n / (k * n_c) from the class counts seen so far
+        total = sum(self.class_counts.values())
+        weights = {label: total / (len(self.class_counts) * count) for label, count in self.class_counts.items()}
+        return np.array([weights[label] for label in y])
+
+    def _count_classes(self, y):
+        labels, counts = np.unique(y, return_counts=True)
+        for label, count in zip(labels, counts):
+            self.class_counts[label] = self.class_counts.get(label, 0) + int(count)
+        # SGD's alpha is a per-row penalty; LogisticRegression's C applies to the summed loss over all rows
+        self.model.set_params(alpha=1.0 / (C * sum(self.class_counts.values())))
+
+    def initialise(self):
+        """Selects features and fits the model on the whole file as it is now."""
+        df = load_data(self.path, columns=columns_for_grade(self.grade, self.target_column))
+        self.feature_names = cumulative_features(df, self.grade, self.target_column)
+        if 'gender' in self.feature_names:
+            self.label_encoder.fit(df['gender'].astype(str))
+
+        X, y, rows = self._prepare(df, 0)
+        train = rows % HOLDOUT_EVERY != 0
+        self.scaler = StandardScaler().fit(X[train])
+        self.class_counts = {}
+        self._count_classes(y[train])
+
+        X_train = self.scaler.transform(X[train])
+        start = time.perf_counter()
+        self.model.fit(X_train, y[train], sample_weight=self._sample_weight(y[train]))
+        # The SGD fit sets up classes and the learning-rate schedule for partial_fit; the coefficients
+        # then start at the batch optimum (the same objective, since alpha = 1 / (C * rows)), so a fresh
+        # model is level with the batch model the drift check compares it to, and --rebase clears drift
+        batch = self._batch_model(X_train, y[train])
+        self.model.coef_ = batch.coef_.copy()
+        self.model.intercept_ = batch.intercept_.copy()
+        seconds = time.perf_counter() - start
+
+        self.offset = df.attrs['fingerprint'][1]
+        self.tail = tail_digest(self.path, self.offset)
+        self.rows_seen = len(df)
+        self.updates_since_check = 0
+        self.history.append({'event': 'initialise', 'rows': int(train.sum()), 'seconds': seconds})
+        return self
+
+    def update(self):
+        """Trains on the rows appended since the last update; returns the number of new training rows.
+
+        Only the appended bytes are read and only they are passed to
+        partial_fit, so the cost follows the size of the new cohort. If the
+        file was rewritten rather than appended to, the model is refit on the
+        whole file instead (see rewritten).
+        """
+        if self.rewritten:
+            self.initialise()
+            return self.history[-1]['rows']
+
+        new, self.offset = read_appended(self.path, self.offset, columns=columns_for_grade(self.grade, self.target_column))
+        self.tail = tail_digest(self.path, self.offset)
+        first_row = self.rows_seen
+        self.rows_seen += len(new)
+        if new.empty:
+            return 0
+
+        X, y, rows = self._prepare(new.reset_index(drop=True), first_row)
+        train = rows % HOLDOUT_EVERY != 0
+        X, y = self.scaler.transform(X[train]), y[train]
+        self._count_classes(y)
+        sample_weight = self._sample_weight(y)
+
+        start = time.perf_counter()
+        rng = np.random.default_rng(self.rows_seen)
+        for _ in range(EPOCHS):
+            order = rng.permutation(len(y))
+            self.model.partial_fit(X[order], y[order], classes=self.model.classes_,
+                                   sample_weight=None if sample_weight is None else sample_weight[order])
+        seconds = time.perf_counter() - start
+
+        self.updates_since_check += 1
+        self.history.append({'event': 'update', 'rows': len(y), 'seconds': seconds})
+        return len(y)
+
+    @property
+    def rewritten(self):
+        """True when the bytes before the last read offset changed or the file shrank, so the offset is meaningless."""
+        try:
+            return os.path.getsize(self.path) < self.offset or tail_digest(self.path, self.offset) != self.tail
+        except FileNotFoundError:
+            raise FileNotFoundError(f"🚫 File not found at path: {self.path}")
+
+    def _batch_model(self, X, y):
+        """The LogisticRegression the grade pages would fit for this variant, fit on standardised X."""
+        class_weight = 'balanced' if self.variant == 'balanced' else None
+        batch = clone(LogisticModel(None, self.target_column, registry=None, class_weight=class_weight).model)
+        return batch.fit(X, y)
+
+    @property
+    def check_due(self):
+        return self.updates_since_check >= CHECK_EVERY
+
+    def full_refit_check(self):
+        """Fits the batch LogisticRegression on every ingested training row and compares it with this model.
+
+        Both are scored on the held-out rows; coefficients are compared in
+        standardised units. This reads the whole history, so it runs every
+        CHECK_EVERY updates rather than on each one.
+        """
+        df = load_data(self.path, columns=columns_for_grade(self.grade, self.target_column)).iloc[:self.rows_seen]
+        X, y, rows = self._prepare(df, 0)
+        train, holdout = rows % HOLDOUT_EVERY != 0, rows % HOLDOUT_EVERY == 0
+
+        batch_scaler = StandardScaler().fit(X[train])
+        batch = self._batch_model(batch_scaler.transform(X[train]), y[train])
+
+        # Per-point coefficients, then rescaled by the batch model's feature spread so both are in the same units
+        incremental_coef = self.model.coef_[0] / self.scaler.scale_ * batch_scaler.scale_
+        batch_coef = batch.coef_[0]
+        cosine = float(incremental_coef @ batch_coef / (np.linalg.norm(incremental_coef) * np.linalg.norm(batch_coef)))
+
+        incremental_accuracy = accuracy_score(y[holdout], self.model.predict(self.scaler.transform(X[holdout])))
+        batch_accuracy = accuracy_score(y[holdout], batch.predict(batch_scaler.transform(X[holdout])))
+        report = {
+            'event': 'check',
+            'rows': int(train.sum()),
+            'incremental_accuracy': incremental_accuracy,
+            'batch_accuracy': batch_accuracy,
+            'max_coef_difference': float(np.abs(incremental_coef - batch_coef).max()),
+            'coef_cosine': cosine,
+            'drift': batch_accuracy - incremental_accuracy > MAX_ACCURACY_GAP,
+        }
+
+        self.updates_since_check = 0
+        self.history.append(report)
+        return report
+
+    def save(self):
+        os.makedirs(INCREMENTAL_DIR, exist_ok=True)
+        tmp_path = f"{self.store_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # Plain state rather than the instance, so loading doesn't depend on how this module was run
+        joblib.dump(self.__dict__, tmp_path)
+        os.replace(tmp_path, self.store_path)
+
+    @classmethod
+    def load(cls, path, grade, variant='baseline', target_column='track'):
+        """The saved incremental model for this dataset file and grade, or None."""
+        try:
+            state = joblib.load(incremental_path(path, grade, variant, target_column))
+        except FileNotFoundError:
+            return None
+        # Saved before the tail was tracked: the next update can't verify the offset, so it refits
+        state.setdefault('tail', None)
+        model = cls.__new__(cls)
+        model.__dict__.update(state)
+        return model
+
+
+def incremental_path(path, grade, variant, target_column='track'):
+    name = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+    return os.path.join(INCREMENTAL_DIR, f"{name}-{target_column}-g{grade}-{variant}.joblib")
+
+
+def _print_check(report):
+    print(
+        f"  Full-refit check on {report['rows']:,} rows: accuracy {report['incremental_accuracy']:.4f} incremental "
+        f"vs {report['batch_accuracy']:.4f} batch, coefficient cosine {report['coef_cosine']:.3f}, "
+        f"max |Δcoef| {report['max_coef_difference']:.3f}"
+    )
+    if report['drift']:
+        print(f"⚠️ Incremental model trails the batch model by more than {MAX_ACCURACY_GAP:.0%}; rerun with --rebase or init.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally update a grade model from rows appended to the dataset.")
+    parser.add_argument('command', choices=['init', 'update', 'check'])
+    parser.add_argument('--grade', type=int, choices=[7, 8, 9, 10], required=True)
+    parser.add_argument('--variant', choices=VARIANTS, default='baseline')
+    parser.add_argument('--train-data', default=DEFAULT_PATH)
+    parser.add_argument('--target', default='track')
+    parser.add_argument('--rebase', action='store_true', help="Re-initialise from the full data if the check finds drift")
+    args = parser.parse_args(argv)
+
+    model = IncrementalGradeModel.load(args.train_data, args.grade, args.variant, args.target)
+    if args.command == 'init' or model is None:
+        if args.command != 'init':
+            print("No incremental model saved yet; initialising from the full file.")
+        model = IncrementalGradeModel(args.train_data, args.grade, args.variant, args.target).initialise()
+        print(f"Initialised on {model.history[-1]['rows']:,} rows in {model.history[-1]['seconds']:.3f}s")
+    elif args.command == 'update':
+        start = time.perf_counter()
+        refit = model.rewritten
+        rows = model.update()
+        if refit:
+            print(f"⚠️ The file was rewritten, not appended to; refit on all {rows:,} training rows instead.")
+        else:
+            print(f"Updated with {rows:,} new training rows in {time.perf_counter() - start:.3f}s ({model.rows_seen:,} rows ingested in total)")
+
+    if args.command == 'check' or model.check_due:
+        report = model.full_refit_check()
+        _print_check(report)
+        if report['drift'] and args.rebase:
+            model = IncrementalGradeModel(args.train_data, args.grade, args.variant, args.target).initialise()
+            print("Re-initialised from the full file.")
+
+    model.save()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# Dependency-light scoring of exported logistic regression models (NumPy only).
+#
+# Usage:
+#   python -m utils.inference export --grade 10 --output models/grade10_baseline.npz
+import argparse
+import sys
+
+import numpy as np
+
+# Largest probability difference from sklearn accepted for an exported model (float32 scoring)
+TOLERANCE = 1e-5
+
+
+class LinearScorer:
+    """Logistic regression inference as one dot product and a sigmoid over float32 arrays.
+
+    Built from a trained LogisticModel/BalancedLogisticModel (coefficients,
+    intercept, feature order, gender encoding and any feature scaling), saved
+    as a small .npz artifact and loaded without pandas or scikit-learn.
+    """
+
+    def __init__(self, coef, intercept, features, classes, gender_classes, mean=None, scale=None):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.features = [str(f) for f in features]
+        self.classes = np.asarray(classes)
+        self.gender_classes = [str(g) for g in gender_classes]
+        self.mean = np.zeros(len(self.features)) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = np.ones(len(self.features)) if scale is None else np.asarray(scale, dtype=np.float64)
+
+        # Fold the scaling into the weights so scoring is a single matmul
+        weights = self.coef / self.scale
+        self._weights = np.ascontiguousarray(weights.T, dtype=np.float32)
+        self._bias = (self.intercept - weights @ self.mean).astype(np.float32)
+        self._gender_codes = {label: code for code, label in enumerate(self.gender_classes)}
+
+    @classmethod
+    def from_model(cls, model):
+        scaler = getattr(model, 'scaler', None)
+        return cls(
+            coef=model.model.coef_,
+            intercept=model.model.intercept_,
+            features=model.feature_names,
+            classes=model.model.classes_,
+            gender_classes=model.label_encoder.classes_ if hasattr(model.label_encoder, 'classes_') else [],
+            mean=scaler.mean_ if scaler is not None else None,
+            scale=scaler.scale_ if scaler is not None else None,
+        )
+
+    def save(self, path):
+        np.savez(
+            path,
+            coef=self.coef,
+            intercept=self.intercept,
+            features=np.array(self.features),
+            classes=self.classes.astype(str),
+            gender_classes=np.array(self.gender_classes),
+            mean=self.mean,
+            scale=self.scale,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as artifact:
+            return cls(**{name: artifact[name] for name in artifact.files})
+
+    def encode(self, students):
+        """Builds the float32 feature matrix from a list of student dicts."""
+        X = np.empty((len(students), len(self.features)), dtype=np.float32)
+        for i, student in enumerate(students):
+            for j, feature in enumerate(self.features):
+                value = student[feature]
+                if feature == 'gender':
+                    if value not in self._gender_codes:
+                        raise ValueError(f"Unknown gender '{value}'. Expected one of: {', '.join(self.gender_classes)}")
+                    value = self._gender_codes[value]
+                X[i, j] = value
+        return X
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        z = X @ self._weights + self._bias
+
+        if z.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-z[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+
+        # Multinomial: softmax over the class scores
+        z -= z.max(axis=1, keepdims=True)
+        np.exp(z, out=z)
+        z /= z.sum(axis=1, keepdims=True)
+        return z
+
+    def predict(self, X):
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
+
+
+def max_abs_difference(scorer, model, X):
+    """Largest probability difference between the scorer and the trained model (sklearn) on X."""
+    expected = model.predict_proba(X)
+    actual = scorer.predict_proba(np.asarray(X, dtype=np.float64))
+    return float(np.abs(expected - actual).max())
+
+
+def main(argv=None):
+    from utils.dataloader import DEFAULT_PATH
+    from utils.pipeline import VARIANTS, run_pipeline
+
+    parser = argparse.ArgumentParser(description="Export a trained grade model to a NumPy scoring artifact.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export')
+    export.add_argument('--grade', type=int, choices=[7, 8, 9, 10], required=True)
+    export.add_argument('--variant', choices=VARIANTS, default='baseline')
+    export.add_argument('--train-data', default=DEFAULT_PATH)
+    export.add_argument('--scale', action='store_true', help="Export the model trained on standardised features")
+    export.add_argument('--output', required=True, help="Path of the .npz artifact")
+    args = parser.parse_args(argv)
+
+    model = run_pipeline(args.grade, variant=args.variant, path=args.train_data, scale=args.scale).model
+    scorer = LinearScorer.from_model(model)
+    scorer.save(args.output)
+
+    # Check the exported scorer against sklearn on the model's test split
+    diff = max_abs_difference(LinearScorer.load(args.output), model, model.X_test)
+    print(f"Exported grade {args.grade} {args.variant} model to {args.output} (max |Δp| vs sklearn: {diff:.2e})")
+    if diff > TOLERANCE:
+        print(f"⚠️ Exported scorer differs from sklearn by more than {TOLERANCE:.0e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,6 @@
+import hashlib
+import time
+
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -6,14 +9,32 @@ import streamlit as st
 
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.metrics import accuracy_score
+
+from utils.model_registry import ModelRegistry, default_registry
+
+# Aggregations reported per predicted class by calculate_grade_statistics, with their column labels
+GRADE_STATISTICS = {'min': 'Min', 'max': 'Max', 'mean': 'Mean', 'median': 'Median', 'count': 'Count'}
+
+def _seed_digest(init_coef):
+    coef, intercept = init_coef
+    digest = hashlib.sha1(np.ascontiguousarray(coef, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(intercept, dtype=float).tobytes())
+    return digest.hexdigest()
+
 
 class LogisticModel:
-    def __init__(self, df, target_column):
+    def __init__(self, df, target_column, registry=default_registry, class_weight=None, scale=False, params=None):
         self.df = df
+        self.registry = registry
         self.target_column = target_column
-        self.model = LogisticRegression(max_iter=1000)
-        # self.model = LogisticRegression(class_weight='balanced', max_iter=1000)
+        # params overrides the estimator defaults, e.g. a tuned C, penalty and solver
+        self.model = LogisticRegression(class_weight=class_weight, max_iter=1000, **(params or {}))
+        # Optional standardisation fit on the training split; raw 75-100 grades are ill-conditioned for lbfgs
+        self.scale = scale
+        self.scaler = None
+        self.fit_seconds = None
         self.feature_importances = None
         self.track_distribution_data = None
         self.grade_stats = None
@@ -24,7 +45,8 @@ class LogisticModel:
             self.df['gender'] = self.label_encoder.fit_transform(self.df['gender'])
         return self.df
 
-    def train_model(self, grade, features):
+    def prepare_data(self, grade, features):
+        """Encodes, filters and splits the data once; the result can be shared by several models."""
         self.df = self.encode_categorical()
 
         included_grades = list(range(7, grade + 1))
@@ -38,70 +60,157 @@ class LogisticModel:
 
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-        self.model.fit(X_train, y_train)
+        return {
+            'df': self.df,
+            'label_encoder': self.label_encoder,
+            'filtered_df': filtered_df,
+            'X': X,
+            'y': y,
+            'X_train': X_train,
+            'X_test': X_test,
+            'y_train': y_train,
+            'y_test': y_test,
+        }
+
+    def train_model(self, grade, features):
+        self.fit_prepared(self.prepare_data(grade, features), grade, features)
+
+    def fit_prepared(self, data, grade, features, init_coef=None):
+        """Fits (or loads from the registry) the model on data from prepare_data.
+
+        init_coef is a (coef, intercept) pair that seeds the solver; it only
+        takes effect when the model has warm_start enabled.
+        """
+        self.df = data['df']
+        self.label_encoder = data['label_encoder']
+
+        key = None
+        if self.registry is not None:
+            options = {'scale': self.scale}
+            if init_coef is not None and self.model.warm_start:
+                # A different seed converges to slightly different coefficients; keep their entries apart
+                options['warm_start_from'] = _seed_digest(init_coef)
+            key = ModelRegistry.model_key(self.df, self.target_column, grade, features, self.model, **options)
+        entry = self.registry.load(key) if key else None
+
+        if entry is not None:
+            # Reuse the persisted model and split instead of refitting
+            self.model = entry['model']
+            self.scaler = entry.get('scaler')
+            self.label_encoder = entry['label_encoder']
+            self.fit_seconds = entry['metrics'].get('fit_seconds')
+            X_test, y_test = data['X'].loc[entry['test_index']], data['y'].loc[entry['test_index']]
+        else:
+            X_train = data['X_train']
+            if self.scale:
+                self.scaler = StandardScaler().set_output(transform='pandas').fit(X_train)
+                X_train = self.scaler.transform(X_train)
+            if init_coef is not None and self.model.warm_start:
+                self.model.coef_ = np.array(init_coef[0], dtype=float)
+                self.model.intercept_ = np.array(init_coef[1], dtype=float)
+
+            start = time.perf_counter()
+            self.model.fit(X_train, data['y_train'])
+            self.fit_seconds = time.perf_counter() - start
+            X_test, y_test = data['X_test'], data['y_test']
+
         self.feature_names = features
+        self.feature_std = data['X_train'].std(ddof=0)
 
         self.X_test = X_test
         self.y_test = y_test
-        self.y_pred = self.model.predict(X_test)
-        self.y_proba = self.model.predict_proba(X_test)
+        self.y_pred = self.predict(X_test)
+        self.y_proba = self.predict_proba(X_test)
+
+        if entry is None and key:
+            self.registry.save(key, {
+                'model': self.model,
+                'scaler': self.scaler,
+                'label_encoder': self.label_encoder,
+                'features': list(features),
+                'grade': grade,
+                'train_index': data['X_train'].index.to_numpy(),
+                'test_index': X_test.index.to_numpy(),
+                'metrics': {
+                    'accuracy': accuracy_score(y_test, self.y_pred),
+                    'n_iter': int(self.model.n_iter_.max()),
+                    'fit_seconds': self.fit_seconds,
+                },
+            })
 
         self.total_predictions = len(self.y_pred)
         self.prediction_counts = dict(pd.Series(self.y_pred).value_counts())
         self.track_distribution_data = pd.Series(self.y_pred).value_counts(normalize=True) * 100
 
+        filtered_df = data['filtered_df']
         self.df_with_predictions = filtered_df.copy()
-        self.df_with_predictions['predicted_track'] = self.model.predict(filtered_df[features])
-
-    def calculate_grade_statistics(self, features):
-        df_with_track = self.X_test.copy()
-        df_with_track[self.target_column] = self.y_pred
-
-        # Calculate stats per predicted track
-        stats = df_with_track.groupby(self.target_column).agg(
-            {feature: ['min', 'max', 'mean', 'median', 'count'] for feature in features}
-        )
-
-        # Build result DataFrame
-        subjects = []
-        for subject in features:
-            academic_min = stats[subject]['min'].get('Academic', np.nan)
-            academic_max = stats[subject]['max'].get('Academic', np.nan)
-            academic_mean = stats[subject]['mean'].get('Academic', np.nan)
-            academic_median = stats[subject]['median'].get('Academic', np.nan)
-            academic_count = stats[subject]['count'].get('Academic', 0)
-
-            tvl_min = stats[subject]['min'].get('TVL', np.nan)
-            tvl_max = stats[subject]['max'].get('TVL', np.nan)
-            tvl_mean = stats[subject]['mean'].get('TVL', np.nan)
-            tvl_median = stats[subject]['median'].get('TVL', np.nan)
-            tvl_count = stats[subject]['count'].get('TVL', 0)
-
-            subjects.append([
-                academic_min, academic_max, academic_mean, academic_median, academic_count,
-                tvl_min, tvl_max, tvl_mean, tvl_median, tvl_count
-            ])
-
-        result_df = pd.DataFrame(
-            subjects,
-            columns=[
-                'Academic (Min)', 'Academic (Max)', 'Academic (Mean)', 'Academic (Median)', 'Academic (Count)',
-                'TVL (Min)', 'TVL (Max)', 'TVL (Mean)', 'TVL (Median)', 'TVL (Count)'
-            ],
-            index=features
+        self.df_with_predictions['predicted_track'] = self.predict(filtered_df[features])
+
+    def _transform(self, X):
+        return self.scaler.transform(X) if self.scaler is not None else X
+
+    def predict(self, X):
+        return self.model.predict(self._transform(X))
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(self._transform(X))
+
+    @property
+    def n_iter(self):
+        return int(self.model.n_iter_.max())
+
+    def coefficients_for(self, features):
+        """This model's (coef, intercept) laid out for another feature list, zero for features it doesn't use."""
+        coef = np.zeros((self.model.coef_.shape[0], len(features)))
+        position = {feature: i for i, feature in enumerate(self.feature_names)}
+        for j, feature in enumerate(features):
+            if feature in position:
+                coef[:, j] = self.model.coef_[:, position[feature]]
+        return coef, self.model.intercept_.copy()
+
+    def calculate_grade_statistics(self, features, population='test'):
+        """Min, max, mean, median and count of each feature per predicted class.
+
+        Returns one row per feature and '<class> (<Stat>)' columns for every
+        class the model knows, predicted or not. population='all' aggregates
+        the whole scored population (df_with_predictions) instead of the test split.
+        """
+        if population == 'all':
+            frame = self.df_with_predictions[features]
+            predicted = self.df_with_predictions['predicted_track'].to_numpy()
+        else:
+            frame = self.X_test[features]
+            predicted = np.asarray(self.y_pred)
+
+        # (class) x (feature, stat) -> (feature) x (class, stat) in one aggregation and reshape
+        stats = frame.groupby(predicted).agg(list(GRADE_STATISTICS)).T.unstack(level=1)
+        classes = [str(label) for label in self.model.classes_]
+        stats = stats.reindex(
+            columns=pd.MultiIndex.from_product([classes, list(GRADE_STATISTICS)]), index=features
         )
 
-        return result_df
+        counts = stats.xs('count', axis=1, level=1, drop_level=False)
+        stats[counts.columns] = counts.fillna(0).astype('int64')
+        stats.columns = [f"{label} ({GRADE_STATISTICS[stat]})" for label, stat in stats.columns]
+        return stats
     
     def get_coefficients(self):
         if self.model and self.feature_names:
             coefs = self.model.coef_[0]
+            if self.scaler is not None:
+                # Fit in standardised units; per-point (original unit) effect is coef / std
+                scaled_coefs = coefs
+                coefs = scaled_coefs / self.scaler.scale_
+            else:
+                # Effect of a one-standard-deviation change, comparable across features
+                scaled_coefs = coefs * self.feature_std[self.feature_names].to_numpy()
             return pd.DataFrame({
                 "Feature": self.feature_names,
-                "Coefficient": coefs
+                "Coefficient": coefs,
+                "Scaled Coefficient": scaled_coefs
             }).sort_values(by="Coefficient", ascending=False)
         else:
-            return pd.DataFrame(columns=["Feature", "Coefficient"])
+            return pd.DataFrame(columns=["Feature", "Coefficient", "Scaled Coefficient"])
 
 
     def get_track_distribution(self):
@@ -122,3 +231,24 @@ class LogisticModel:
         gender_counts = df_with_track.groupby([self.target_column, 'gender']).size().unstack(fill_value=0)
 
         return gender_counts
+
+
+def train_joint(df, target_column, grade, features, registry=default_registry, scale=False, params=None):
+    """Trains the baseline and class-balanced models from one shared split.
+
+    The data is encoded, filtered and split once, and the balanced fit is
+    warm-started from the baseline coefficients. params optionally maps
+    'baseline'/'balanced' to estimator parameters. Returns (baseline, balanced).
+    """
+    from utils.balanced_logreg import BalancedLogisticModel
+
+    params = params or {}
+    baseline = LogisticModel(df, target_column, registry=registry, scale=scale, params=params.get('baseline'))
+    balanced = BalancedLogisticModel(df, target_column, registry=registry, scale=scale, params=params.get('balanced'))
+    balanced.model.set_params(warm_start=True)
+
+    data = baseline.prepare_data(grade, features)
+    baseline.fit_prepared(data, grade, features)
+    balanced.fit_prepared(data, grade, features, init_coef=baseline.coefficients_for(features))
+
+    return baseline, balanced
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import threading
+
+import joblib
+
+MODEL_DIR = 'models'
+MAX_ENTRIES = 64
+MAX_BYTES = 256 * 1024 * 1024
+
+
+class ModelRegistry:
+    """Trained models persisted on disk, so reruns load a file instead of refitting.
+
+    Each entry holds the fitted estimator together with everything needed to
+    rebuild the page outputs (label encoder, feature list, split indices,
+    metrics). Entries are evicted least-recently-used first once the registry
+    exceeds max_entries or max_bytes. With refresh=True lookups always miss, so
+    models are retrained and overwrite their entries.
+    """
+
+    def __init__(self, root=MODEL_DIR, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, refresh=False):
+        self.root = root
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be pickled; worker processes get their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def model_key(df, target_column, grade, features, estimator, **options):
+        """Key for a model trained on df; None when df didn't come from load_data.
+
+        options covers training choices outside the estimator (e.g. feature scaling).
+        """
+        fingerprint = df.attrs.get('fingerprint')
+        if fingerprint is None:
+            return None
+
+        params = sorted((name, repr(value)) for name, value in estimator.get_params().items())
+        parts = [fingerprint[3], len(df), target_column, grade, tuple(features), type(estimator).__name__, params]
+        if options:
+            parts.append(sorted(options.items()))
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.joblib")
+
+    def load(self, key):
+        if key is None or self.refresh:
+            return None
+
+        path = self._path(key)
+        try:
+            entry = joblib.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Unreadable or written by an incompatible version; drop it and retrain
+            self._remove(path)
+            return None
+
+        # Touch the entry so eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def save(self, key, entry):
+        if key is None:
+            return
+
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            joblib.dump(entry, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            # A read-only deployment just falls back to training on every run
+            return
+
+        self._evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        # The lock is per process; pool workers evict the same directory concurrently, so
+        # another process may remove an entry between listdir and stat
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.root):
+                if name.endswith('.joblib'):
+                    try:
+                        stat = os.stat(os.path.join(self.root, name))
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, name))
+
+            entries.sort(reverse=True)
+            total_bytes = 0
+            for i, (mtime, size, name) in enumerate(entries):
+                total_bytes += size
+                if i >= self.max_entries or total_bytes > self.max_bytes:
+                    self._remove(os.path.join(self.root, name))
+
+    def clear(self):
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith('.joblib'):
+                    self._remove(os.path.join(self.root, name))
+
+
+default_registry = ModelRegistry()
@@ -0,0 +1,257 @@
+import copy
+import os
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.dataloader import DEFAULT_PATH, load_data, read_appended, tail_digest
+from utils.pipeline_cache import PipelineCache
+from utils.streaming import RunningSummary
+
+# Subjects shown in the per-track average tables (the overall average column is left out)
+OVERVIEW_SUBJECTS = ['filipino', 'english', 'math', 'science', 'ap', 'tle', 'mapeh', 'esp']
+PERCENTILES = [0, 25, 50, 75, 100]
+
+overview_cache = PipelineCache(max_entries=8)
+
+# Latest overview of each file, which the next version of the file can extend
+_latest = {}
+_latest_lock = threading.Lock()
+
+
+class DatasetOverview:
+    """Every table the Data Overview page shows, kept as aggregates that can be merged.
+
+    The numeric columns are pulled out once as a single array; missing counts
+    and moments (a streaming.RunningSummary), quantiles and the per-track
+    sums all come from it. Track, age and gender counts come from one
+    bincount over combined category codes.
+
+    Everything except the quantiles is a sum or a pairwise merge, so update()
+    folds in appended rows without touching the earlier ones. Quantiles can't
+    be merged exactly; update() marks them stale until refresh_quantiles() is
+    given the full data.
+    """
+
+    def __init__(self, df, group_column='track'):
+        self.group_column = group_column
+        self.columns = df.columns
+        self.numeric_columns = df.select_dtypes(include='number').columns
+        # Missing counts and count/mean/M2/min/max, merged chunk by chunk
+        self.summary = RunningSummary()
+        self.group_sums = self.group_present = None
+        self.group_sizes = None
+        self.crosstabs = {}
+        # Where the aggregated rows end in the source file, for update_from_file
+        self.path = self.offset = self.tail = None
+
+        values, present = self._numeric_values(df)
+        self._add(df, values, present)
+        self.quantiles = self._quantiles(values, present)
+
+    def _numeric_values(self, df):
+        values = df[self.numeric_columns].to_numpy(dtype='float64')
+        return values, ~np.isnan(values)
+
+    def _add(self, df, values, present):
+        """Folds the sums, counts and moments of df into the stored aggregates."""
+        self.summary.update(df, values=values)
+        filled = np.where(present, values, 0)
+
+        # Per-track sums and counts of every numeric column as one matrix product
+        groups = df[self.group_column]
+        codes = groups.cat.codes.to_numpy() if isinstance(groups.dtype, pd.CategoricalDtype) else pd.factorize(groups)[0]
+        labels = groups.cat.categories if isinstance(groups.dtype, pd.CategoricalDtype) else pd.unique(groups.dropna())
+        has_group = codes >= 0
+        onehot = np.zeros((len(labels), len(codes)))
+        onehot[codes[has_group], np.flatnonzero(has_group)] = 1
+        index = pd.Index(list(labels), name=self.group_column)
+        sums = pd.DataFrame(onehot @ filled, index=index, columns=self.numeric_columns)
+        counts = pd.DataFrame(onehot @ present, index=index, columns=self.numeric_columns)
+        sizes = pd.Series(np.bincount(codes[has_group], minlength=len(labels)), index=index, name='count')
+        self.group_sums = self._merge_counts(self.group_sums, sums)
+        self.group_present = self._merge_counts(self.group_present, counts)
+        self.group_sizes = self._merge_counts(self.group_sizes, sizes)
+
+        for column in ['age', 'gender']:
+            if column in df.columns:
+                table = self._crosstab(df, column, codes, index)
+                self.crosstabs[column] = self._merge_counts(self.crosstabs.get(column), table)
+
+    @staticmethod
+    def _merge_counts(stored, new):
+        """Adds count tables by label, so groups first seen in a later chunk are kept."""
+        if stored is None:
+            return new
+        merged = stored.add(new, fill_value=0)
+        return merged.astype(stored.dtypes.iloc[0] if isinstance(stored, pd.DataFrame) else stored.dtype)
+
+    @staticmethod
+    def _quantiles(values, present):
+        # Partition each column as a contiguous row; nanpercentile goes column by column, so only use it where there are gaps
+        columns_first = np.ascontiguousarray(values.T)
+        gaps = ~present.all(axis=0)
+        quantiles = np.empty((len(PERCENTILES), values.shape[1]))
+        quantiles[:, ~gaps] = np.percentile(columns_first[~gaps], PERCENTILES, axis=1, overwrite_input=True)
+        if gaps.any():
+            with warnings.catch_warnings():
+                # Columns with no values at all get NaN quantiles, as in describe()
+                warnings.simplefilter('ignore', RuntimeWarning)
+                quantiles[:, gaps] = np.nanpercentile(columns_first[gaps], PERCENTILES, axis=1, overwrite_input=True)
+        return quantiles
+
+    @staticmethod
+    def _crosstab(df, column, codes, index):
+        col_codes, col_labels = pd.factorize(df[column], sort=True)
+        valid = (codes >= 0) & (col_codes >= 0)
+        counts = np.bincount(codes[valid] * len(col_labels) + col_codes[valid], minlength=len(index) * len(col_labels))
+        return pd.DataFrame(counts.reshape(len(index), len(col_labels)), index=index, columns=col_labels)
+
+    def update(self, df):
+        """Folds appended rows into the aggregates; quantiles go stale until refresh_quantiles()."""
+        if list(df.columns) != list(self.columns):
+            raise ValueError("appended rows have different columns from the aggregated data")
+        if len(df):
+            values, present = self._numeric_values(df)
+            self._add(df, values, present)
+            self.quantiles = None
+        return self
+
+    def refresh_quantiles(self, df):
+        """Recomputes the quantiles, which can't be merged, from the full data."""
+        self.quantiles = self._quantiles(*self._numeric_values(df))
+        return self
+
+    def track_file(self, path, offset):
+        """Records that the aggregates cover path up to byte offset, so update_from_file can read only what follows."""
+        self.path, self.offset, self.tail = path, offset, tail_digest(path, offset)
+        return self
+
+    def update_from_file(self):
+        """Reads and folds in the rows appended to the tracked file since the last read.
+
+        Raises ValueError if the file was rewritten rather than appended to.
+        """
+        if tail_digest(self.path, self.offset) != self.tail:
+            raise ValueError(f"{self.path} was rewritten, not appended to")
+        delta, end = read_appended(self.path, self.offset, columns=list(self.columns))
+        self.update(delta)
+        return self.track_file(self.path, end)
+
+    @property
+    def rows(self):
+        return self.summary.rows
+
+    @property
+    def missing(self):
+        return pd.Series(self.summary.missing, dtype='int64').reindex(self.columns)
+
+    @property
+    def describe(self):
+        """describe() plus a median row; quantile rows are NaN while they are stale."""
+        stats = self.summary.result().reindex(columns=self.numeric_columns)
+        stats.loc['count'] = stats.loc['count'].fillna(0)
+        quantiles = self.quantiles if self.quantiles is not None else np.full((len(PERCENTILES), len(self.numeric_columns)), np.nan)
+        quantiles = pd.DataFrame(quantiles[[1, 2, 3, 2]], index=['25%', '50%', '75%', 'median'], columns=self.numeric_columns)
+        return pd.concat([stats.loc[['count', 'mean', 'std', 'min']], quantiles.iloc[:3], stats.loc[['max']], quantiles.iloc[3:]])
+
+    @property
+    def group_counts(self):
+        return self.group_sizes[self.group_sizes > 0]
+
+    @property
+    def group_means(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.group_sums / self.group_present
+        return means[self.group_sizes > 0]
+
+    def _table(self, column):
+        table = self.crosstabs[column][self.group_sizes > 0]
+        return table.loc[:, table.sum(axis=0) > 0]
+
+    @property
+    def age_table(self):
+        return self._table('age') if 'age' in self.crosstabs else None
+
+    @property
+    def gender_table(self):
+        return self._table('gender') if 'gender' in self.crosstabs else None
+
+    def missing_summary(self):
+        return self.missing[self.missing > 0]
+
+    def track_distribution(self):
+        counts = self.group_counts.sort_values(ascending=False, kind='stable')
+        return pd.DataFrame({
+            'Count': counts,
+            'Percentage': (counts / counts.sum() * 100).round(2).astype(str) + '%',
+        })
+
+    def grade_means(self, grade):
+        """Average subject grades per track for one grade level."""
+        columns = [f"g{grade}_{subject}" for subject in OVERVIEW_SUBJECTS if f"g{grade}_{subject}" in self.group_means.columns]
+        return self.group_means[columns].round(2)
+
+    @staticmethod
+    def _with_total(table):
+        total = pd.DataFrame([table.sum(axis=0)], index=['Total'])
+        combined = pd.concat([table, total], axis=0)
+        combined.index = combined.index.astype(str)
+        combined.index.name = 'Track'
+        return combined.reset_index()
+
+    def age_distribution(self):
+        return self._with_total(self.age_table)
+
+    def gender_distribution(self):
+        return self._with_total(self.gender_table)
+
+    def age_counts_long(self):
+        return self.age_table.rename_axis(index=self.group_column, columns='age').stack().reset_index(name='count')
+
+    def gender_counts_long(self):
+        long = self.gender_table.rename_axis(index=self.group_column, columns='gender').stack().reset_index(name='count')
+        return long[long['count'] > 0]
+
+
+def _build_overview(df):
+    path, size = df.attrs['fingerprint'][:2]
+    with _latest_lock:
+        previous = _latest.get(path)
+
+    overview = None
+    if previous is not None and previous.offset is not None and previous.offset < size:
+        # Appended rows: merge the delta into a copy of the last overview; only the quantiles need the full data
+        try:
+            overview = copy.deepcopy(previous).update_from_file()
+        except (OSError, ValueError):
+            overview = None
+        if overview is not None and overview.offset == size:
+            overview.refresh_quantiles(df)
+        else:
+            # Rewritten, or grown again since df was loaded
+            overview = None
+
+    if overview is None:
+        overview = DatasetOverview(df)
+        try:
+            if os.path.getsize(path) == size:
+                overview.track_file(path, size)
+        except OSError:
+            pass
+
+    with _latest_lock:
+        _latest[path] = overview
+    return overview
+
+
+def dataset_overview(path=DEFAULT_PATH, cache=overview_cache):
+    """DatasetOverview of the file, computed once per dataset fingerprint and shared by every session.
+
+    When the file has only grown since the last overview, the new one is
+    built from the appended rows rather than the full history.
+    """
+    df = load_data(path)
+    return cache.get_or_compute(df.attrs['fingerprint'], lambda: _build_overview(df))
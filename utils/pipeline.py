@@ -0,0 +1,88 @@
+from utils.dataloader import DEFAULT_PATH, columns_for_grade, load_data
+from utils.feature_selection import FeatureSelector
+from utils.logistic_regression import train_joint
+from utils.model_registry import default_registry
+from utils.pipeline_cache import shared_cache
+
+VARIANTS = ('baseline', 'balanced')
+
+
+class GradePipelineResult:
+    """Everything the model and evaluation pages show for one grade level and model variant."""
+
+    def __init__(self, grade, variant, features, model, subject_stats):
+        self.grade = grade
+        self.variant = variant
+        self.features = features
+        self.model = model
+        self.subject_stats = subject_stats
+        self.y_pred = model.y_pred
+        self.y_proba = model.y_proba
+
+
+def cumulative_features(df, grade, target_column='track'):
+    """Significant subject features for grades 7 up to grade, plus age and gender."""
+    selector = FeatureSelector(df, target_column)
+
+    final_features = []
+    for g in range(7, grade + 1):
+        feats = selector.select_features(g)
+        prefix = f"g{g}_"
+        final_features.extend([f for f in feats if f.startswith(prefix)])
+
+    # Add age and gender only once
+    if 'age' in df.columns:
+        final_features.append('age')
+    if 'gender' in df.columns:
+        final_features.append('gender')
+
+    # Remove duplicates while preserving order
+    return list(dict.fromkeys(final_features))
+
+
+def _grade_result(grade, variant, features, model):
+    # Filter out non-subject features when calculating stats
+    subject_features = [feat for feat in features if feat not in ['gender', 'age']]
+    subject_stats = model.calculate_grade_statistics(subject_features)
+    return GradePipelineResult(grade, variant, features, model, subject_stats)
+
+
+def build_pipeline(df, grade, target_column='track', registry=default_registry, scale=False, params=None):
+    """Selects features and trains both model variants for a grade; returns {variant: result}."""
+    features = cumulative_features(df, grade, target_column)
+
+    # One shared split for both variants; the balanced fit warm-starts from the baseline
+    baseline, balanced = train_joint(df, target_column, grade, features, registry=registry, scale=scale, params=params)
+
+    return {
+        'baseline': _grade_result(grade, 'baseline', features, baseline),
+        'balanced': _grade_result(grade, 'balanced', features, balanced),
+    }
+
+
+def run_pipeline(grade, variant='baseline', target_column='track', path=DEFAULT_PATH, cache=shared_cache, scale=False, tuned=False):
+    """Returns the feature selection, trained model and grade statistics for a grade level.
+
+    Both variants are trained together and shared by every page and session in
+    the process, keyed by (dataset fingerprint, grade, scaling), so switching
+    between the model and evaluation pages or opening the app in many browsers
+    trains each grade once. scale=True standardises the features before fitting.
+    tuned=True uses the hyperparameters saved by utils.tuning for this dataset
+    and grade, when there are any.
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown model variant '{variant}'. Expected one of: {', '.join(VARIANTS)}")
+
+    df = load_data(path, columns=columns_for_grade(grade, target_column))
+
+    params = None
+    if tuned:
+        from utils.tuning import load_tuned_params
+
+        params = load_tuned_params(df, grade, target_column)
+        if params is not None:
+            # Tuning is done on standardised features, so the tuned C only holds for scaled models
+            scale = True
+
+    key = (df.attrs['fingerprint'], grade, target_column, scale, repr(params))
+    return cache.get_or_compute(key, lambda: build_pipeline(df, grade, target_column, scale=scale, params=params))[variant]
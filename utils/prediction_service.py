@@ -0,0 +1,211 @@
+# Local HTTP service for single-student track predictions.
+#
+# Usage:
+#   python -m utils.prediction_service serve --port 8600
+#   python -m utils.prediction_service --incremental serve     # models from utils.incremental
+#   curl -X POST localhost:8600/predict -d '{"grade": 7, "age": 16, "gender": "Male", "g7_math": 88.5, ...}'
+#   python -m utils.prediction_service bench --requests 2000 --concurrency 16
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from utils.dataloader import DEFAULT_PATH, GRADE_LEVELS, load_data
+from utils.incremental import IncrementalGradeModel
+from utils.inference import LinearScorer
+from utils.pipeline import VARIANTS, run_pipeline
+
+
+class StudentPredictor:
+    """Predicts the track for one student from a dict of grades, age and gender."""
+
+    def __init__(self, model):
+        self.scorer = LinearScorer.from_model(model)
+        self.features = self.scorer.features
+
+    def predict(self, student):
+        missing = [f for f in self.features if f not in student]
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+        X = self.scorer.encode([student])
+        # null and NaN would score to a NaN probability; reject them like any other unusable value
+        invalid = [f for f, finite in zip(self.features, np.isfinite(X[0])) if not finite]
+        if invalid:
+            raise ValueError(f"Fields must be finite numbers: {', '.join(invalid)}")
+
+        proba = self.scorer.predict_proba(X)[0]
+        best = int(np.argmax(proba))
+        classes = self.scorer.classes
+        return {
+            'predicted_track': str(classes[best]),
+            'probability': float(proba[best]),
+            'probabilities': {str(label): float(p) for label, p in zip(classes, proba)},
+        }
+
+
+def load_predictors(variant='baseline', path=DEFAULT_PATH, scale=False, incremental=False):
+    """Trains (or loads from the registry) one predictor per grade level.
+
+    With incremental=True the predictors use the models saved by
+    utils.incremental instead, which must exist for every grade.
+    """
+    if not incremental:
+        return {grade: StudentPredictor(run_pipeline(grade, variant=variant, path=path, scale=scale).model) for grade in GRADE_LEVELS}
+
+    models = {grade: IncrementalGradeModel.load(path, grade, variant) for grade in GRADE_LEVELS}
+    missing = [str(grade) for grade, model in models.items() if model is None]
+    if missing:
+        raise ValueError(f"No incremental {variant} model saved for grade(s) {', '.join(missing)} of {path}; "
+                         f"run python -m utils.incremental init first")
+    return {grade: StudentPredictor(model) for grade, model in models.items()}
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; Nagle would hold the body back ~40 ms
+    disable_nagle_algorithm = True
+    predictors = {}
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'grades': sorted(self.predictors)})
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            student = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(student, dict):
+                raise ValueError("Request body must be a JSON object of one student's fields")
+            grade = int(student.get('grade', 0))
+            if grade not in self.predictors:
+                raise ValueError(f"'grade' must be one of: {', '.join(map(str, sorted(self.predictors)))}")
+            result = self.predictors[grade].predict(student)
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        result['grade'] = grade
+        self._send_json(200, result)
+
+    def log_message(self, format, *args):
+        # Per-request logging to stderr dominates latency; keep the service quiet
+        pass
+
+
+def make_server(predictors, host='127.0.0.1', port=8600):
+    handler = type('BoundPredictionHandler', (PredictionHandler,), {'predictors': predictors})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def run_benchmark(predictors, requests=2000, concurrency=16, path=DEFAULT_PATH):
+    """Sends concurrent /predict requests to an in-process server; returns latency percentiles in ms."""
+    server = make_server(predictors, port=0)
+    host, port = server.server_address
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Realistic payloads built from the dataset's complete records (the service rejects missing values), cycling through grades
+    df = load_data(path).drop(columns=['track', 'strand'], errors='ignore').dropna()
+    records = df.astype(object).to_dict('records')
+    payloads = []
+    for i in range(requests):
+        student = dict(records[i % len(records)])
+        student['grade'] = GRADE_LEVELS[i % len(GRADE_LEVELS)]
+        payloads.append(json.dumps(student, default=float).encode())
+
+    local = threading.local()
+
+    def send(payload):
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection(host, port)
+        start = time.perf_counter()
+        local.conn.request('POST', '/predict', body=payload, headers={'Content-Type': 'application/json'})
+        response = local.conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"Request failed with status {response.status}")
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(send, payloads)))
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    server.server_close()
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'mean_ms': float(latencies.mean()),
+        'requests_per_s': requests / elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Single-student track prediction service.")
+    parser.add_argument('--variant', choices=VARIANTS, default='baseline')
+    parser.add_argument('--train-data', default=DEFAULT_PATH)
+    parser.add_argument('--scale', action='store_true', help="Use the models trained on standardised features")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Use the models kept up to date by utils.incremental instead of the batch-trained ones")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help="Run the HTTP service")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8600)
+
+    bench = commands.add_parser('bench', help="Measure p50/p99 latency under concurrent requests")
+    bench.add_argument('--requests', type=int, default=2000)
+    bench.add_argument('--concurrency', type=int, default=16)
+
+    args = parser.parse_args(argv)
+    try:
+        predictors = load_predictors(args.variant, args.train_data, args.scale, args.incremental)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == 'serve':
+        server = make_server(predictors, args.host, args.port)
+        print(f"Serving track predictions for grades {', '.join(map(str, predictors))} on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    else:
+        stats = run_benchmark(predictors, args.requests, args.concurrency, args.train_data)
+        print(
+            f"{stats['requests']} requests, concurrency {stats['concurrency']}: "
+            f"p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+            f"mean {stats['mean_ms']:.2f} ms, {stats['requests_per_s']:,.0f} req/s"
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from utils.dataloader import DEFAULT_CHUNKSIZE, DEFAULT_PATH, iter_chunks
+
+
+def stream_data(consumers, path=DEFAULT_PATH, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """Feeds the file chunk by chunk to each consumer's update(chunk) and returns the row count.
+
+    Only one chunk is held in memory at a time, so peak memory depends on
+    chunksize rather than on the size of the file.
+    """
+    total_rows = 0
+    for chunk in iter_chunks(path, chunksize=chunksize, columns=columns):
+        for consumer in consumers:
+            consumer.update(chunk)
+        total_rows += len(chunk)
+    return total_rows
+
+
+class RunningSummary:
+    """Describe-style statistics accumulated one chunk at a time."""
+
+    def __init__(self):
+        self.numeric = {}
+        self.value_counts = {}
+        self.missing = {}
+        self.rows = 0
+
+    def update(self, chunk, values=None):
+        """Merges a chunk into the statistics.
+
+        values may pass the chunk's numeric columns as a float64 array when
+        the caller has already extracted them.
+        """
+        self.rows += len(chunk)
+
+        numeric_columns = chunk.select_dtypes(include='number').columns
+        if values is None:
+            values = chunk[numeric_columns].to_numpy(dtype='float64')
+        present = ~np.isnan(values)
+
+        missing = dict(zip(numeric_columns, (~present).sum(axis=0)))
+        for col in chunk.columns.difference(numeric_columns):
+            missing[col] = chunk[col].isna().sum()
+        for col in chunk.columns:
+            self.missing[col] = self.missing.get(col, 0) + int(missing[col])
+
+        if len(numeric_columns):
+            filled = np.where(present, values, 0)
+            count = present.sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = filled.sum(axis=0) / count
+            centred = (filled - np.nan_to_num(mean)) * present
+            m2 = np.einsum('ij,ij->j', centred, centred)
+            del centred
+            col_min = np.where(present, values, np.inf).min(axis=0)
+            col_max = np.where(present, values, -np.inf).max(axis=0)
+
+            for i, col in enumerate(numeric_columns):
+                if count[i] == 0:
+                    continue
+                self._merge_moments(col, count[i], mean[i], m2[i], col_min[i], col_max[i])
+
+        for col in chunk.columns.difference(numeric_columns):
+            counts = chunk[col].value_counts()
+            if col in self.value_counts:
+                counts = self.value_counts[col].add(counts, fill_value=0).astype('int64')
+            self.value_counts[col] = counts
+
+    def _merge_moments(self, col, n_b, mean_b, m2_b, min_b, max_b):
+        if col not in self.numeric:
+            self.numeric[col] = [n_b, mean_b, m2_b, min_b, max_b]
+            return
+
+        # Chan et al. pairwise update keeps the variance stable across chunks
+        n_a, mean_a, m2_a, min_a, max_a = self.numeric[col]
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        self.numeric[col] = [
+            n,
+            mean_a + delta * n_b / n,
+            m2_a + m2_b + delta ** 2 * n_a * n_b / n,
+            min(min_a, min_b),
+            max(max_a, max_b),
+        ]
+
+    def result(self):
+        rows = {}
+        for col, (n, mean, m2, col_min, col_max) in self.numeric.items():
+            std = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+            rows[col] = {'count': n, 'mean': mean, 'std': std, 'min': col_min, 'max': col_max}
+        return pd.DataFrame(rows, index=['count', 'mean', 'std', 'min', 'max'])
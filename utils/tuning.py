@@ -0,0 +1,236 @@
+# Hyperparameter search (C, penalty, class weighting) for the grade-level track models.
+#
+# Usage:
+#   python -m utils.tuning --grade 10 --workers 4 --compare
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, balanced_accuracy_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+from utils.dataloader import DEFAULT_PATH, GRADE_LEVELS, columns_for_grade, load_data
+from utils.logistic_regression import LogisticModel
+from utils.model_registry import MODEL_DIR
+from utils.pipeline import cumulative_features
+
+# Strongest to weakest regularisation, the order the path is walked in
+C_GRID = np.logspace(-3, 2, 11)
+PENALTIES = ['l2', 'l1']
+CLASS_WEIGHTS = [None, 'balanced']
+SCORINGS = ['roc_auc', 'accuracy', 'balanced_accuracy']
+
+# Both solvers support warm_start; lbfgs can't fit l1
+SOLVER_FOR_PENALTY = {'l2': 'lbfgs', 'l1': 'saga'}
+
+TUNED_PARAMS_PATH = os.path.join(MODEL_DIR, 'tuned_params.json')
+
+_params_lock = threading.Lock()
+
+
+class TuningResult:
+    """Mean validation scores for every (penalty, class_weight, C) candidate of one grade.
+
+    best is the top candidate overall; best_by_class_weight holds the top
+    candidate for each class weighting (what the baseline and balanced pages use).
+    cold_* are only set when the search was run with compare=True.
+    """
+
+    def __init__(self, grade, features, scoring, candidates, warm_iterations, warm_seconds,
+                 cold_iterations=None, cold_seconds=None):
+        self.grade = grade
+        self.features = features
+        self.scoring = scoring
+        self.candidates = candidates
+        self.warm_iterations = warm_iterations
+        self.warm_seconds = warm_seconds
+        self.cold_iterations = cold_iterations
+        self.cold_seconds = cold_seconds
+
+        ranked = candidates.sort_values([scoring, 'C'], ascending=[False, True])
+        self.best = ranked.iloc[0].to_dict()
+        self.best_by_class_weight = {
+            weight: group.iloc[0].to_dict() for weight, group in ranked.groupby('class_weight', sort=False)
+        }
+
+    def params_for(self, class_weight):
+        """Estimator parameters of the best candidate for a class weighting ('none' or 'balanced')."""
+        best = self.best_by_class_weight[class_weight]
+        return {'C': float(best['C']), 'penalty': best['penalty'], 'solver': SOLVER_FOR_PENALTY[best['penalty']]}
+
+
+def _walk_path(X, y, train_index, val_index, penalty, class_weight, Cs, warm):
+    """Fits one (penalty, class_weight) candidate for every C on one inner fold.
+
+    With warm=True a single estimator walks the path, each fit starting from
+    the previous C's coefficients; otherwise every C is fit from scratch.
+    """
+    scaler = StandardScaler().fit(X[train_index])
+    X_train, X_val = scaler.transform(X[train_index]), scaler.transform(X[val_index])
+    y_train, y_val = y[train_index], y[val_index]
+
+    estimator = None
+    rows = []
+    for C in Cs:
+        params = dict(penalty=penalty, C=C, solver=SOLVER_FOR_PENALTY[penalty], class_weight=class_weight, max_iter=1000)
+        if estimator is None or not warm:
+            estimator = LogisticRegression(warm_start=warm, **params)
+        else:
+            estimator.set_params(C=C)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            start = time.perf_counter()
+            estimator.fit(X_train, y_train)
+            seconds = time.perf_counter() - start
+
+        positive = estimator.classes_[1]
+        y_pred = estimator.predict(X_val)
+        rows.append({
+            'penalty': penalty,
+            'class_weight': class_weight or 'none',
+            'C': C,
+            'roc_auc': roc_auc_score(y_val == positive, estimator.predict_proba(X_val)[:, 1]),
+            'accuracy': accuracy_score(y_val, y_pred),
+            'balanced_accuracy': balanced_accuracy_score(y_val, y_pred),
+            'n_iter': int(np.max(estimator.n_iter_)),
+            'seconds': seconds,
+        })
+    return rows
+
+
+def _search(X, y, folds, Cs, penalties, class_weights, warm, workers):
+    paths = Parallel(n_jobs=workers)(
+        delayed(_walk_path)(X, y, train_index, val_index, penalty, class_weight, Cs, warm)
+        for penalty in penalties
+        for class_weight in class_weights
+        for train_index, val_index in folds
+    )
+    return pd.DataFrame([row for path in paths for row in path])
+
+
+def tune_grade(df, grade, target_column='track', Cs=C_GRID, penalties=PENALTIES, class_weights=CLASS_WEIGHTS,
+               scoring='roc_auc', n_splits=3, workers=None, compare=False):
+    """Searches C, penalty and class weighting for a grade model by inner k-fold CV.
+
+    Only the model's training split is used, so the hold-out test split the
+    evaluation pages report on stays unseen. Each (penalty, class_weight, fold)
+    path runs in its own worker. compare=True also fits every candidate from a
+    cold start to measure what the warm starts saved.
+    """
+    features = cumulative_features(df, grade, target_column)
+    data = LogisticModel(df, target_column, registry=None).prepare_data(grade, features)
+    X = np.asarray(data['X_train'], dtype=float)
+    y = np.asarray(data['y_train'].astype(str))
+
+    folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, y))
+    workers = workers or min(len(penalties) * len(class_weights) * n_splits, os.cpu_count() or 1)
+    Cs = np.sort(np.asarray(Cs, dtype=float))
+
+    warm = _search(X, y, folds, Cs, penalties, class_weights, True, workers)
+    cold = _search(X, y, folds, Cs, penalties, class_weights, False, workers) if compare else None
+
+    candidates = warm.groupby(['penalty', 'class_weight', 'C'], as_index=False, sort=False).agg(
+        roc_auc=('roc_auc', 'mean'),
+        accuracy=('accuracy', 'mean'),
+        balanced_accuracy=('balanced_accuracy', 'mean'),
+        n_iter=('n_iter', 'sum'),
+        seconds=('seconds', 'sum'),
+    )
+    return TuningResult(
+        grade, features, scoring, candidates,
+        warm_iterations=int(warm['n_iter'].sum()),
+        warm_seconds=float(warm['seconds'].sum()),
+        cold_iterations=int(cold['n_iter'].sum()) if cold is not None else None,
+        cold_seconds=float(cold['seconds'].sum()) if cold is not None else None,
+    )
+
+
+def _params_key(df, grade, target_column):
+    return f"{df.attrs['fingerprint'][3]}:{target_column}:{grade}"
+
+
+def _read_params(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_tuned_params(df, grade, target_column, result, path=TUNED_PARAMS_PATH):
+    """Records the tuned parameters for a dataset (by content hash) and grade, for run_pipeline(tuned=True)."""
+    entry = {
+        'params': {
+            'baseline': result.params_for('none'),
+            'balanced': result.params_for('balanced'),
+        },
+        'scoring': result.scoring,
+        'best': {name: (float(v) if isinstance(v, (np.floating, float)) else v) for name, v in result.best.items()},
+        'features': list(result.features),
+    }
+
+    with _params_lock:
+        entries = _read_params(path)
+        entries[_params_key(df, grade, target_column)] = entry
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def load_tuned_params(df, grade, target_column, path=TUNED_PARAMS_PATH):
+    """{'baseline': params, 'balanced': params} saved for this dataset and grade, or None."""
+    entry = _read_params(path).get(_params_key(df, grade, target_column))
+    return entry['params'] if entry else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune C, penalty and class weighting for the grade-level track models.")
+    parser.add_argument('--grade', type=int, nargs='*', choices=GRADE_LEVELS, default=GRADE_LEVELS)
+    parser.add_argument('--train-data', default=DEFAULT_PATH)
+    parser.add_argument('--target', default='track')
+    parser.add_argument('--scoring', choices=SCORINGS, default='roc_auc')
+    parser.add_argument('--folds', type=int, default=3, help="Inner CV folds on the training split")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--compare', action='store_true', help="Also fit every candidate cold and report what warm starts saved")
+    parser.add_argument('--no-save', action='store_true', help="Report only; don't update the tuned parameters")
+    args = parser.parse_args(argv)
+
+    for grade in args.grade:
+        df = load_data(args.train_data, columns=columns_for_grade(grade, args.target))
+        result = tune_grade(df, grade, args.target, scoring=args.scoring, n_splits=args.folds,
+                            workers=args.workers, compare=args.compare)
+
+        print(f"Grade {grade}: best {result.best['penalty']} C={result.best['C']:.4g} class_weight={result.best['class_weight']} "
+              f"({args.scoring} {result.best[args.scoring]:.4f})")
+        for weight, best in result.best_by_class_weight.items():
+            print(f"  {weight:>8}: {best['penalty']} C={best['C']:.4g} ({args.scoring} {best[args.scoring]:.4f})")
+
+        line = f"  Path: {result.warm_iterations} iterations, {result.warm_seconds:.2f}s fit time"
+        if result.cold_iterations is not None:
+            saved = 1 - result.warm_seconds / result.cold_seconds
+            line += (f" vs {result.cold_iterations} iterations, {result.cold_seconds:.2f}s independent "
+                     f"({1 - result.warm_iterations / result.cold_iterations:.0%} fewer iterations, {saved:.0%} less time)")
+        print(line)
+
+        if not args.no_save:
+            save_tuned_params(df, grade, args.target, result)
+    if not args.no_save:
+        print(f"Saved tuned parameters to {TUNED_PARAMS_PATH}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())